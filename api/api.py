@@ -5,6 +5,7 @@ from enum import Enum
 from fastapi import FastAPI
 from fastapi.middleware import Middleware
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import ORJSONResponse
 
 from api.rate_limiter import RateLimitMiddleware
 from api.routers import auth, bridge, config
@@ -35,6 +36,8 @@ class BridgeAPI:  # pylint: disable=too-few-public-methods
             description=config_instance.application.description,
             version=config_instance.application.version,
             debug=config_instance.application.debug,
+            # The ORJSONResponse serializes the responses of every router with orjson
+            default_response_class=ORJSONResponse,
             # The RateLimitMiddleware is used to limit the number of requests to 20 per minute
             middleware=[
                 Middleware(RateLimitMiddleware, limit=20, interval=60),
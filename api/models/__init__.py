@@ -8,6 +8,6 @@ try:
     )
     from .base_response_schema import BaseResponse
     from .bridge_schema import BridgeResponse, BridgeResponseSchema
-    from .health_schema import Health, HealthHistory, HealthHistoryManager, HealthSchema
+    from .health_schema import Health, HealthHistory, HealthSchema
 except ImportError as ex:
     raise ex
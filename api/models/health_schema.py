@@ -1,6 +1,5 @@
 """Health Schema.""" ""
 
-from multiprocessing.managers import BaseManager
 from typing import Dict
 
 from pydantic import BaseModel
@@ -71,7 +70,3 @@ class HealthHistory:
     def get_health_history(self):
         """Return the health history."""
         return self.health_history
-
-
-class HealthHistoryManager(BaseManager):
-    """Health History Manager."""
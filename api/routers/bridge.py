@@ -1,15 +1,14 @@
 """Bridge controller router."""
 import asyncio
-from typing import List
 
-from fastapi import APIRouter, WebSocket, WebSocketDisconnect
+import orjson
+from fastapi import APIRouter, Response, WebSocket
 
 from api.models import (
     BridgeResponse,
     BridgeResponseSchema,
     Health,
     HealthHistory,
-    HealthHistoryManager,
     HealthSchema,
 )
 from api.routers.health import HealthcheckSubscriber, WSConnectionManager
@@ -30,139 +29,204 @@ logger = Logger.get_logger(config.application.name)
 class BridgeRouter:  # pylint: disable=too-many-instance-attributes
     """Bridge Router."""
 
+    # (method, path, route kwargs, handler name)
+    _ROUTES = (
+        (
+            "post",
+            "/",
+            {
+                "name": "Start the Telegram to Discord Bridge",
+                "summary": "Initiate the forwarding.",
+                "description": "Starts the Bridge controller triggering the Telegram authentication process.",
+                "response_model": BridgeResponseSchema,
+            },
+            "start",
+        ),
+        (
+            "delete",
+            "/",
+            {
+                "name": "Stop the Telegram to Discord Bridge",
+                "summary": "Removes the Bridge process.",
+                "description": "Suspends the Bridge forwarding messages from Telegram to Discord and stops the process.",
+                "response_model": BridgeResponseSchema,
+            },
+            "stop",
+        ),
+        (
+            "get",
+            "/health",
+            {
+                "name": "Get the health status of the Bridge.",
+                "summary": "Determines the Bridge process status, the Telegram, Discord, and OpenAI connections health and returns a summary.",
+                "description": "Determines the Bridge process status, and the Telegram, Discord, and OpenAI connections health.",
+                "response_model": HealthSchema,
+            },
+            "health",
+        ),
+        (
+            "websocket",
+            "/health/ws",
+            {"name": "Get the health status of the Bridge."},
+            "health_websocket_endpoint",
+        ),
+    )
+
     def __init__(self):
         """Initialize the Bridge Router."""
 
         self.forwarder = Forwarder(event_loop=asyncio.get_running_loop())
-        self.telegram_handler: TelegramHandler
+        self.telegram_handler = TelegramHandler(dispatcher=self.forwarder.dispatcher)
+        # keep the session state in memory instead of a stat on every response
+        self.session_watcher_task = asyncio.create_task(
+            self.telegram_handler.watch_session_files(), name="session_watcher_task"
+        )
 
-        self.dispatcher: EventDispatcher
-        HealthHistoryManager.register("HealthHistory", HealthHistory)
+        # the forwarder runs on this event loop, share the history in-process
+        self.health_history: HealthHistory = HealthHistory()
 
-        self.health_history_manager_instance = HealthHistoryManager()
-        self.health_history_manager_instance.start()  # pylint: disable=consider-using-with # the server must stay alive as long as we want the shared object to be accessible
-        self.health_history: HealthHistory = self.health_history_manager_instance.HealthHistory()  # type: ignore # pylint: disable=no-member
+        # the health broadcast pipeline lives as long as the router
+        self.ws_connection_manager = WSConnectionManager(self.health_history)
+        self.broadcaster_task = asyncio.create_task(
+            self.ws_connection_manager.run_broadcaster(),
+            name="health_broadcaster_task",
+        )
+        self.dispatcher = EventDispatcher()
+        self.healthcheck_subscriber = HealthcheckSubscriber(
+            "healthcheck_subscriber",
+            self.dispatcher,
+            self.health_history,
+            self.ws_connection_manager,
+        )
 
-        self.ws_connection_manager: WSConnectionManager
+        # start and stop requests are queued and run by a single worker,
+        # the handlers don't wait for the controller
+        self.controller_commands: asyncio.Queue[bool] = asyncio.Queue()
+        self.controller_task = asyncio.create_task(
+            self.run_controller_commands(), name="bridge_controller_task"
+        )
+        self._start_pending = False
+
+        # the response fields that don't change between requests
+        self._bridge_tmpl = {
+            "name": config.application.name,
+            "config_version": config.application.version,
+        }
+        # the last health response, reused while the health data is unchanged
+        self._last_health_key: tuple | None = None
+        self._last_health_bytes: bytes = b""
 
         self.bridge_router = APIRouter(
             prefix="/bridge",
             tags=["bridge"],
+            on_shutdown=[self.shutdown],
         )
 
-        self.bridge_router.post(
-            "/",
-            name="Start the Telegram to Discord Bridge",
-            summary="Initiate the forwarding.",
-            description="Starts the Bridge controller triggering the Telegram authentication process.",
-            response_model=BridgeResponseSchema,
-        )(self.start)
-
-        self.bridge_router.delete(
-            "/",
-            name="Stop the Telegram to Discord Bridge",
-            summary="Removes the Bridge process.",
-            description="Suspends the Bridge forwarding messages from Telegram to Discord and stops the process.",
-            response_model=BridgeResponseSchema,
-        )(self.stop)
+        for method, path, kwargs, handler in self._ROUTES:
+            getattr(self.bridge_router, method)(path, **kwargs)(getattr(self, handler))
 
-        self.bridge_router.get(
-            "/health",
-            name="Get the health status of the Bridge.",
-            summary="Determines the Bridge process status, the Telegram, Discord, and OpenAI connections health and returns a summary.",
-            description="Determines the Bridge process status, and the Telegram, Discord, and OpenAI connections health.",
-            response_model=HealthSchema,
-        )(self.health)
-
-        self.bridge_router.websocket(
-            "/health/ws", name="Get the health status of the Bridge."
-        )(self.health_websocket_endpoint)
+    async def shutdown(self):
+        """Cancel the router background tasks and wait for them to finish."""
+        tasks = (
+            self.session_watcher_task,
+            self.broadcaster_task,
+            self.controller_task,
+        )
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    async def run_controller_commands(self):
+        """Run the queued start and stop commands, one at a time."""
+        while True:
+            start_forwarding = await self.controller_commands.get()
+            try:
+                operation_status: OperationStatus = await self.forwarder.api_controller(
+                    start_forwarding=start_forwarding
+                )
+                logger.info("Operation status: %s", operation_status)
+            except Exception as ex:  # pylint: disable=broad-except
+                logger.error(
+                    "Error running the bridge controller: %s",
+                    ex,
+                    exc_info=config.application.debug,
+                )
+            finally:
+                if start_forwarding:
+                    self._start_pending = False
+                self.telegram_handler.invalidate_session_cache()
+                self.forwarder.invalidate_process_state()
+                self.controller_commands.task_done()
 
     async def start(self):
         """start the bridge."""
 
+        debug = config.application.debug
         process_state, pid = self.forwarder.determine_process_state()
 
         try:
-            if pid == 0 or process_state not in [
-                ProcessStateEnum.RUNNING,
-                ProcessStateEnum.STARTING,
-                ProcessStateEnum.UNKNOWN,
-            ]:
-                # create a shared list of subscribers
-                healthcheck_subscribers: List[HealthcheckSubscriber] = []
-
-                self.ws_connection_manager = WSConnectionManager(self.health_history)
-
-                # create the event dispatcher
-                self.dispatcher = EventDispatcher(subscribers=healthcheck_subscribers)
-                self.healthcheck_subscriber = HealthcheckSubscriber(
-                    "healthcheck_subscriber",
-                    self.dispatcher,
-                    self.health_history,
-                    self.ws_connection_manager,
-                )
+            if not self._start_pending and (
+                pid == 0
+                or process_state
+                not in [
+                    ProcessStateEnum.RUNNING,
+                    ProcessStateEnum.STARTING,
+                    ProcessStateEnum.UNKNOWN,
+                ]
+            ):
+                # the single subscriber wakes the single broadcaster,
+                # no callback is registered per WS client
                 self.dispatcher.add_subscriber(
                     "healthcheck", self.healthcheck_subscriber
                 )
 
-                self.on_update = (
-                    self.healthcheck_subscriber.create_on_update_decorator()
-                )
-
-                self.telegram_handler = TelegramHandler(dispatcher=self.dispatcher)
-
-                # event_loop = asyncio.get_running_loop()
-
-                # controller_task = asyncio.ensure_future(run_controller(self.dispatcher, event_loop, True, False, False,))
-
-                locker = asyncio.Lock()
-                await locker.acquire()
-                # event_loop.create_task(run_controller(self.dispatcher, event_loop, True, False, False))
-                # event_loop.create_task(self.forwarder.api_controller())
-                operation_status: OperationStatus = (
-                    await self.forwarder.api_controller()
-                )
-                locker.release()
-
-                logger.info("Operation status: %s", operation_status)
+                self._start_pending = True
+                self.controller_commands.put_nowait(True)
 
                 return BridgeResponseSchema(
                     bridge=BridgeResponse(
-                        name=config.application.name,
-                        status=operation_status[0],
+                        **self._bridge_tmpl,
+                        status=ProcessStateEnum.STARTING,
                         process_id=pid,
-                        config_version=config.application.version,
                         telegram_authenticated=self.telegram_handler.has_session_file(),
-                        error=operation_status[1],
+                        error="",
                     )
                 )
         except Exception as ex:  # pylint: disable=broad-except
             logger.error(
                 "Error starting the bridge: %s",
                 ex,
-                exc_info=Config.get_instance().application.debug,
+                exc_info=debug,
             )
             return BridgeResponseSchema(
                 bridge=BridgeResponse(
-                    name=config.application.name,
+                    **self._bridge_tmpl,
                     status=ProcessStateEnum.STOPPED,
                     process_id=pid,
-                    config_version=config.application.version,
                     telegram_authenticated=self.telegram_handler.has_session_file(),
                     error=str(ex),
                 )
             )
 
+        if self._start_pending:
+            return BridgeResponseSchema(
+                bridge=BridgeResponse(
+                    **self._bridge_tmpl,
+                    status=ProcessStateEnum.STARTING,
+                    process_id=pid,
+                    telegram_authenticated=self.telegram_handler.has_session_file(),
+                    error="",
+                )
+            )
+
         # if the pid file is empty and the process is not None and is alive,
         # then return that the bridge is starting
         if pid == 0 and process_state == ProcessStateEnum.RUNNING:
             return BridgeResponseSchema(
                 bridge=BridgeResponse(
-                    name=config.application.name,
+                    **self._bridge_tmpl,
                     status=ProcessStateEnum.ORPHANED,
                     process_id=pid,
-                    config_version=config.application.version,
                     telegram_authenticated=self.telegram_handler.has_session_file(),
                     error="",
                 )
@@ -171,10 +235,9 @@ class BridgeRouter:  # pylint: disable=too-many-instance-attributes
         # otherwise return the state of the process
         return BridgeResponseSchema(
             bridge=BridgeResponse(
-                name=config.application.name,
+                **self._bridge_tmpl,
                 status=ProcessStateEnum.RUNNING,
                 process_id=pid,
-                config_version=config.application.version,
                 telegram_authenticated=self.telegram_handler.has_session_file(),
                 error="",
             )
@@ -183,50 +246,42 @@ class BridgeRouter:  # pylint: disable=too-many-instance-attributes
     async def stop(self):
         """stop the bridge."""
 
+        debug = config.application.debug
+        tg_auth = self.telegram_handler.has_session_file()
         process_state, pid = self.forwarder.determine_process_state()
 
-        if process_state == ProcessStateEnum.RUNNING and pid > 0:
+        # a start still queued has no PID yet, the stop is queued to run after it
+        if self._start_pending or (
+            process_state == ProcessStateEnum.RUNNING and pid > 0
+        ):
             try:
-                # await run_controller(dispatcher=self.dispatcher, boot=False, background=False, stop=True)
-                # await self.forwarder.api_controller(start_forwarding=False)
-                self.health_history_manager_instance.shutdown()
-                # self.healthcheck_subscriber.unsubscribe(
-                #     "healthcheck", self.healthcheck_subscriber
-                # )
-                # self.healthcheck_subscriber.subscribers = []
-                # self.healthcheck_subscriber = None
                 self.dispatcher.remove_subscriber(
                     "healthcheck", self.healthcheck_subscriber
                 )
-                # self.dispatcher = None
-                await self.forwarder.api_controller(start_forwarding=False)
+                self.controller_commands.put_nowait(False)
 
-            except asyncio.exceptions.CancelledError:
-                logger.info("Bridge process stopped.")
             except Exception as ex:  # pylint: disable=broad-except
                 logger.error(
                     "Error stopping the bridge: %s",
                     ex,
-                    exc_info=Config.get_instance().application.debug,
+                    exc_info=debug,
                 )
 
             return BridgeResponseSchema(
                 bridge=BridgeResponse(
-                    name=config.application.name,
+                    **self._bridge_tmpl,
                     status=ProcessStateEnum.STOPPING,
                     process_id=pid,
-                    config_version=config.application.version,
-                    telegram_authenticated=self.telegram_handler.has_session_file(),
+                    telegram_authenticated=tg_auth,
                     error="",
                 )
             )
 
         return BridgeResponseSchema(
             bridge=BridgeResponse(
-                name=config.application.name,
+                **self._bridge_tmpl,
                 status=ProcessStateEnum.STOPPED,
                 process_id=pid,
-                config_version=config.application.version,
                 telegram_authenticated=False,
                 error="",
             )
@@ -235,7 +290,7 @@ class BridgeRouter:  # pylint: disable=too-many-instance-attributes
     async def health(self):
         """Return the health status of the Bridge."""
         if self.forwarder is not None:
-            process_state, pid = self.forwarder.determine_process_state()
+            process_state, pid = self.forwarder.cached_process_state()
         else:
             process_state = ProcessStateEnum.STOPPED
             pid = 0
@@ -249,58 +304,39 @@ class BridgeRouter:  # pylint: disable=too-many-instance-attributes
                 )
             )
 
-        return HealthSchema(
-            health=Health(
-                timestamp=health_status.timestamp,
-                process_state=process_state,
-                process_id=pid,
-                status=health_status.status,
+        health_key = (pid, process_state, health_status.timestamp)
+        if health_key != self._last_health_key:
+            health_data = HealthSchema(
+                health=Health(
+                    timestamp=health_status.timestamp,
+                    process_state=process_state,
+                    process_id=pid,
+                    status=health_status.status,
+                )
             )
-        )
-
-    async def health_data_sender(self, websocket: WebSocket):
-        """Send health data to the WS client."""
-        logger.debug("Starting health data sender.")
+            self._last_health_bytes = orjson.dumps(health_data.model_dump())
+            self._last_health_key = health_key
 
-        @self.on_update("healthcheck")
-        async def send_health_data():
-            """Send health data to the WS client."""
-            logger.debug("Sending health data to the WS client.")
-            try:
-                await self.ws_connection_manager.send_health_data(websocket)
-            # pylint: disable=broad-except
-            except Exception as exc:
-                logger.exception(
-                    "Error while sending health data to the WS client: %s",
-                    exc,
-                    exc_info=Config.get_instance().application.debug,
-                )
-                raise exc
+        return Response(content=self._last_health_bytes, media_type="application/json")
 
     async def health_websocket_endpoint(self, websocket: WebSocket):
         """Websocket endpoint."""
         logger.info("Connected to the websocket.")
-        task = None
         try:
             await self.ws_connection_manager.connect(websocket)
-            task = asyncio.create_task(self.health_data_sender(websocket))
 
-            while True:
-                logger.debug("Waiting for message from the client.")
-                _ = await websocket.receive_text()
-        except WebSocketDisconnect:
+            # the broadcaster pushes the health data, only read the control frames
+            logger.debug("Waiting for messages from the client.")
+            async for _ in websocket.iter_text():
+                pass
             logger.info("Disconnecting from the websocket.")
-            if task:
-                task.cancel()
-            await self.ws_connection_manager.disconnect(websocket)
         except Exception as ex:  # pylint: disable=broad-except
             logger.error(
                 "Error in health_websocket_endpoint: %s",
                 ex,
-                exc_info=Config.get_instance().application.debug,
+                exc_info=config.application.debug,
             )
-            if task:
-                task.cancel()
+        finally:
             await self.ws_connection_manager.disconnect(websocket)
 
 
@@ -1,162 +1,172 @@
 """Config router for the API"""
 
 import asyncio
+import contextlib
+import hashlib
 import os
-from datetime import datetime
+import tempfile
+import time
+from typing import Dict
 
-import magic
 import yaml
-from fastapi import APIRouter, File, HTTPException, UploadFile
+from fastapi import APIRouter, File, HTTPException, Response, UploadFile
 from pydantic import ValidationError  # pylint: disable=import-error # SecretStr
 
 from api.models import BaseResponse
-from bridge.config import (
-    APIConfig,
-    ApplicationConfig,
-    Config,
-    ConfigSchema,
-    ConfigYAMLSchema,
-    DiscordConfig,
-    ForwarderConfig,
-    LoggerConfig,
-    OpenAIConfig,
-    TelegramConfig,
-)
+from bridge.config import Config, ConfigSchema, ConfigYAMLSchema
 from bridge.enums import RequestTypeEnum
 from bridge.logger import Logger
 from forwarder import Forwarder
 
+try:
+    # libyaml bindings, several times faster than the pure Python implementation
+    from yaml import CSafeDumper as SafeDumper
+    from yaml import CSafeLoader as SafeLoader
+except ImportError:
+    from yaml import SafeDumper, SafeLoader  # type: ignore
+
 config = Config.get_instance()
 logger = Logger.get_logger(config.application.name)
 
+# The maximum size of an uploaded config file
+CONFIG_MAX_SIZE = 1024 * 1024 * 1
+# The size of the chunks an uploaded config file is read in
+CONFIG_UPLOAD_CHUNK_SIZE = 64 * 1024
+# The write buffer size used when dumping a config file
+CONFIG_WRITE_BUFFER_SIZE = 1024 * 1024
+# The number of validated uploads remembered by their content digest
+VALIDATED_CONFIGS_MAX_SIZE = 32
+
+
+def backup_config_file(config_file_name: str) -> str | None:
+    """Rename an existing config file to a timestamped backup."""
+    if not os.path.exists(config_file_name):
+        return None
+
+    backup_filename = f"{config_file_name}_backup_{time.strftime('%Y%m%d%H%M%S')}.yml"
+    os.replace(config_file_name, backup_filename)
+    return backup_filename
+
+
+def load_config_file(config_file_name: str) -> dict:
+    """Parse a YAML config file."""
+    with open(config_file_name, "rb") as config_file:
+        return yaml.load(config_file, Loader=SafeLoader)
+
+
+def dump_config_file(config_file_name: str, data: dict, **dump_kwargs):
+    """Write the config data to a YAML file."""
+    # write next to the target and swap it in, a crash never leaves half a file
+    tmp_config_file_name = f"{config_file_name}.tmp"
+    try:
+        # the emitter writes many small chunks, let a large buffer coalesce them
+        with open(
+            tmp_config_file_name, "wb", buffering=CONFIG_WRITE_BUFFER_SIZE
+        ) as new_config_file:
+            yaml.dump(
+                data,
+                new_config_file,
+                Dumper=SafeDumper,
+                encoding="utf-8",
+                **dump_kwargs,
+            )
+        os.replace(tmp_config_file_name, config_file_name)
+    finally:
+        with contextlib.suppress(FileNotFoundError):
+            os.remove(tmp_config_file_name)
+
 
 class ConfigRouter:
     """Config router class."""
 
+    # (method, path, route kwargs, handler name)
+    _ROUTES = (
+        (
+            "get",
+            "/",
+            {
+                "response_model": ConfigSchema,
+                "summary": "Get the current config",
+                "description": "The endpoint reports the current loaded config in full, including secrets.",
+            },
+            "get_config",
+        ),
+        (
+            "put",
+            "/",
+            {
+                "response_model": BaseResponse,
+                "summary": "Upload a new config file",
+                "description": "Upload a config file in YAML format and will be versioned `version` field.",
+            },
+            "upload_config",
+        ),
+        (
+            "post",
+            "/",
+            {
+                "response_model": BaseResponse,
+                "summary": "Post a new config",
+                "description": "POST a new config in JSON payload. The file will be versioned `version` field.",
+            },
+            "post_config",
+        ),
+    )
+
     def __init__(self) -> None:
         """Initialize the config router."""
         self.forwarder = Forwarder(event_loop=asyncio.get_running_loop())
+        # the config only changes on upload or post, serve it from memory
+        self._config_cache: ConfigSchema | None = None
+        self._config_json: bytes | None = None
+        self._cached_version: str | None = None
+        # the uploads already validated, keyed by their content digest
+        self._validated_configs: Dict[str, dict] = {}
         self.router = APIRouter(
             prefix="/config",
             tags=["config"],
             responses={404: {"description": "Not found"}},
         )
 
-        self.router.get(
-            "/",
-            response_model=ConfigSchema,
-            summary="Get the current config",
-            description="The endpoint reports the current loaded config in full, including secrets.",
-        )(self.get_config)
-
-        self.router.put(
-            "/",
-            response_model=BaseResponse,
-            summary="Upload a new config file",
-            description="Upload a config file in YAML format and will be versioned `version` field.",
-        )(self.upload_config)
+        for method, path, kwargs, handler in self._ROUTES:
+            getattr(self.router, method)(path, **kwargs)(getattr(self, handler))
 
-        self.router.post(
-            "/",
-            response_model=BaseResponse,
-            summary="Post a new config",
-            description="POST a new config in JSON payload. The file will be versioned `version` field.",
-        )(self.post_config)
+        # build the config sub-models up front, not on the first request
+        self.cache_config()
 
-    async def get_config(self) -> ConfigSchema:
+    async def get_config(self) -> Response:
         """Get the current config."""
+        # rebuild when the loaded config was swapped for another version
+        if (
+            self._config_json is None
+            or self._cached_version != config.application.version
+        ):
+            self.cache_config()
 
-        application_config = ApplicationConfig(
-            name=config.application.name,
-            version=config.application.version,
-            description=config.application.description,
-            debug=config.application.debug,
-            healthcheck_interval=config.application.healthcheck_interval,
-            recoverer_delay=config.application.recoverer_delay,
-            anti_spam_enabled=config.application.anti_spam_enabled,
-            anti_spam_similarity_timeframe=config.application.anti_spam_similarity_timeframe,
-            anti_spam_similarity_threshold=config.application.anti_spam_similarity_threshold,
-            anti_spam_contextual_analysis=config.application.anti_spam_contextual_analysis,
-        )
-
-        api_config = APIConfig(
-            enabled=config.api.enabled,
-            cors_origins=config.api.cors_origins,
-            telegram_login_enabled=config.api.telegram_login_enabled,
-            telegram_auth_file=config.api.telegram_auth_file,
-            telegram_auth_request_expiration=config.api.telegram_auth_request_expiration,
-        )
-
-        logger_config = LoggerConfig(
-            level=config.logger.level,
-            file_max_bytes=config.logger.file_max_bytes,
-            file_backup_count=config.logger.file_backup_count,
-            format=config.logger.format,
-            date_format=config.logger.date_format,
-            console=config.logger.console,
-        )
-
-        telegram_config = TelegramConfig(
-            phone=config.telegram.phone,
-            password=config.telegram.password,
-            api_id=config.telegram.api_id,
-            api_hash=config.telegram.api_hash,
-            log_unhandled_dialogs=config.telegram.log_unhandled_dialogs,
-        )
-
-        discord_config = DiscordConfig(
-            bot_token=config.discord.bot_token,
-            built_in_roles=config.discord.built_in_roles,
-            max_latency=config.discord.max_latency,
-        )
+        return Response(content=self._config_json, media_type="application/json")
 
-        openai_config = OpenAIConfig(
-            api_key=config.openai.api_key,
-            enabled=config.openai.enabled,
-            organization=config.openai.organization,
-            sentiment_analysis_prompt=config.openai.sentiment_analysis_prompt,
-        )
+    def cache_config(self):
+        """Build the config schema and its JSON once, until the next invalidation."""
+        self._config_cache = self._build_config_schema()
+        self._config_json = self._config_cache.model_dump_json().encode()
+        self._cached_version = config.application.version
 
-        telegram_forwarders = []
-        for forwarder in config.telegram_forwarders:
-            telegram_forwarders.append(
-                ForwarderConfig(
-                    forwarder_name=forwarder["forwarder_name"],
-                    tg_channel_id=forwarder["tg_channel_id"],
-                    discord_channel_id=forwarder["discord_channel_id"],
-                    mention_everyone=forwarder["mention_everyone"],
-                    forward_everything=forwarder["forward_everything"],
-                    strip_off_links=forwarder["strip_off_links"],
-                    forward_hashtags=forwarder["forward_hashtags"]
-                    if forwarder["forward_hashtags"]
-                    else [],
-                    excluded_hashtags=forwarder["excluded_hashtags"]
-                    if forwarder["excluded_hashtags"] in forwarder
-                    else [],
-                    mention_override=forwarder["mention_override"]
-                    if forwarder["mention_override"] in forwarder
-                    else None,
-                )
-            )
+    def invalidate_config_cache(self):
+        """Drop the cached config, the next request rebuilds it."""
+        self._config_cache = None
+        self._config_json = None
+        self._cached_version = None
 
-        return ConfigSchema(
-            config=ConfigYAMLSchema(
-                application=application_config,
-                logger=logger_config,
-                api=api_config,
-                telegram=telegram_config,
-                discord=discord_config,
-                openai=openai_config,
-                telegram_forwarders=telegram_forwarders,
-            )
-        )
+    def _build_config_schema(self) -> ConfigSchema:
+        """Build the config schema from the loaded config."""
+        return ConfigSchema.from_config(config)
 
     async def upload_config(
         self, file: UploadFile = File(...)
     ) -> BaseResponse:  # pylint: disable=too-many-locals
         """Upload a new config file."""
 
-        process_state, pid = self.forwarder.determine_process_state()
+        process_state, pid = self.forwarder.cached_process_state()
 
         response = BaseResponse(
             resource="config",
@@ -166,16 +176,11 @@ class ConfigRouter:
             bridge_pid=pid,
         )
 
-        content = await file.read()
-
-        mime = magic.Magic(mime=True)
-        mime_type = mime.from_buffer(content)
-
-        response.operation_status["mime_type"] = mime_type
         response.operation_status["file_name"] = (
             file.filename if file.filename else "unknown"
         )
 
+        # reject on the declared name and size before reading the body
         if not file.filename:
             raise HTTPException(status_code=400, detail="Invalid file name.")
 
@@ -186,56 +191,93 @@ class ConfigRouter:
         ):
             raise HTTPException(status_code=400, detail="Invalid file name.")
 
-        if file.size is None or file.size > 1024 * 1024 * 1:
+        if file.size is None or file.size > CONFIG_MAX_SIZE:
             raise HTTPException(
                 status_code=400,
                 detail="Invalid file size. Only file size less than 1MB is accepted.",
             )
 
-        logger.debug("Uploaded file type: %s", mime_type)
-        if mime_type != "text/plain":
-            raise HTTPException(
-                status_code=400, detail="Invalid file type. Only YAML file is accepted."
-            )
-
-        try:
-            new_config_file_content = yaml.safe_load(content)
-        except yaml.YAMLError as exc:
-            raise HTTPException(
-                status_code=400, detail="Invalid YAML structure in the config file."
-            ) from exc
-
-        try:
-            _ = ConfigYAMLSchema(**new_config_file_content)
-        except ValidationError as exc:
-            for error in exc.errors():
-                logger.error(error)
-            raise HTTPException(
-                status_code=400, detail=f"Invalid configuration: {exc.errors}"
-            ) from exc
-
-        new_config_file_name = (
-            f'config-{new_config_file_content["application"]["version"]}.yml'
+        # spool the upload next to its destination, it's moved in place once valid
+        spool = await asyncio.to_thread(
+            tempfile.NamedTemporaryFile, dir=os.curdir, suffix=".yml", delete=False
         )
+        try:
+            size = 0
+            hasher = hashlib.blake2b(digest_size=16)
+            while chunk := await file.read(CONFIG_UPLOAD_CHUNK_SIZE):
+                size += len(chunk)
+                if size > CONFIG_MAX_SIZE:
+                    raise HTTPException(
+                        status_code=400,
+                        detail="Invalid file size. Only file size less than 1MB is accepted.",
+                    )
+                hasher.update(chunk)
+                await asyncio.to_thread(spool.write, chunk)
+            await asyncio.to_thread(spool.close)
+
+            # a YAML file is valid when it parses and validates, no content sniffing
+            response.operation_status["mime_type"] = "application/yaml"
+
+            # an identical upload was already parsed and validated
+            digest = hasher.hexdigest()
+            new_config_file_content = self._validated_configs.get(digest)
+            if new_config_file_content is None:
+                try:
+                    new_config_file_content = await asyncio.to_thread(
+                        load_config_file, spool.name
+                    )
+                except yaml.YAMLError as exc:
+                    raise HTTPException(
+                        status_code=400,
+                        detail="Invalid YAML structure in the config file.",
+                    ) from exc
+
+                if not isinstance(new_config_file_content, dict):
+                    raise HTTPException(
+                        status_code=400,
+                        detail="Invalid file type. Only YAML file is accepted.",
+                    )
+
+                try:
+                    _ = ConfigYAMLSchema(**new_config_file_content)
+                except ValidationError as exc:
+                    for error in exc.errors():
+                        logger.error(error)
+                    raise HTTPException(
+                        status_code=400, detail=f"Invalid configuration: {exc.errors}"
+                    ) from exc
+
+                if len(self._validated_configs) >= VALIDATED_CONFIGS_MAX_SIZE:
+                    del self._validated_configs[next(iter(self._validated_configs))]
+                self._validated_configs[digest] = new_config_file_content
+
+            new_config_file_name = (
+                f'config-{new_config_file_content["application"]["version"]}.yml'
+            )
 
-        response.operation_status["new_config_file_name"] = new_config_file_name
+            response.operation_status["new_config_file_name"] = new_config_file_name
 
-        if os.path.exists(new_config_file_name):
-            backup_filename = f"{new_config_file_name}_backup_{datetime.now().strftime('%Y%m%d%H%M%S')}.yml"
-            os.rename(new_config_file_name, backup_filename)
-            response.operation_status["config_backup_filename"] = backup_filename
+            backup_filename = await asyncio.to_thread(
+                backup_config_file, new_config_file_name
+            )
+            if backup_filename:
+                response.operation_status["config_backup_filename"] = backup_filename
 
-        with open(new_config_file_name, "w", encoding="utf-8") as new_config_file:
-            yaml.dump(new_config_file_content, new_config_file)
+            await asyncio.to_thread(os.replace, spool.name, new_config_file_name)
+        finally:
+            spool.close()
+            with contextlib.suppress(FileNotFoundError):
+                os.remove(spool.name)
 
         response.success = True
+        self.invalidate_config_cache()
 
         return response
 
     async def post_config(self, config_schema: ConfigSchema) -> BaseResponse:
         """Post a new config file."""
 
-        process_state, pid = self.forwarder.determine_process_state()
+        process_state, pid = self.forwarder.cached_process_state()
 
         response = BaseResponse(
             resource="config",
@@ -249,34 +291,24 @@ class ConfigRouter:
 
         response.operation_status["new_config_file_name"] = config_file_name
 
-        # validate the config with pydantic
-        try:
-            _ = ConfigYAMLSchema(**config_schema.config.model_dump())
-        except ValidationError as exc:
-            for error in exc.errors():
-                logger.error(error)
-            raise HTTPException(
-                status_code=400, detail=f"Invalid configuration: {exc.errors}"
-            ) from exc
-
-        if os.path.exists(config_file_name):
-            backup_filename = f"{config_file_name}_backup_{datetime.now().strftime('%Y%m%d%H%M%S')}.yml"
-            os.rename(config_file_name, backup_filename)
+        # the payload was already validated by pydantic when the request was parsed
+        backup_filename = await asyncio.to_thread(backup_config_file, config_file_name)
+        if backup_filename:
             response.operation_status["config_backup_filename"] = backup_filename
 
-        with open(config_file_name, "w", encoding="utf-8") as new_config_file:
-            yaml.dump(
-                config_schema.config.model_dump(),
-                new_config_file,
-                allow_unicode=False,
-                encoding="utf-8",
-                explicit_start=True,
-                sort_keys=False,
-                indent=2,
-                default_flow_style=False,
-            )
+        await asyncio.to_thread(
+            dump_config_file,
+            config_file_name,
+            config_schema.config.model_dump(),
+            allow_unicode=False,
+            explicit_start=True,
+            sort_keys=False,
+            indent=2,
+            default_flow_style=False,
+        )
 
         response.success = True
+        self.invalidate_config_cache()
 
         return response
 
@@ -2,12 +2,14 @@
 
 import asyncio
 import functools
-from datetime import datetime
-from typing import Any, List
+import time
+import zlib
+from typing import Any, Dict, Set
 
+import orjson
 from fastapi import WebSocket
 
-from api.models import Health, HealthHistory, HealthSchema
+from api.models import Health, HealthHistory
 from bridge.config import Config
 from bridge.enums import ProcessStateEnum
 from bridge.events import EventSubscriber
@@ -19,13 +21,42 @@ config = Config.get_instance()
 logger = Logger.get_logger(config.application.name)
 
 
+# The maximum number of health updates waiting to be sent to a single WS client
+WS_OUTBOX_MAX_SIZE = 32
+# The time in seconds a WS client has to accept a health update
+WS_SEND_TIMEOUT = 5.0
+# The query parameter a WS client sets to receive zlib compressed binary frames
+WS_COMPRESSION_PARAM = "compression"
+
+
 class WSConnectionManager:
     """WS Connection Manager."""
 
     def __init__(self, health_history: HealthHistory):
-        self.active_connections: List[WebSocket] = []
+        self.active_connections: Set[WebSocket] = set()
         self.health_history: HealthHistory = health_history
-        # self.websocket_subscribers: multiprocessing.Queue = multiprocessing.Queue()
+        # clients that opted into zlib compressed health updates
+        self.compressed_connections: Set[WebSocket] = set()
+        # bounded per-client outbox drained by its own sender task, the
+        # broadcaster never waits on a slow client
+        self.outboxes: Dict[WebSocket, asyncio.Queue] = {}
+        self._senders: Dict[WebSocket, asyncio.Task] = {}
+        # the closes of the evicted clients, kept until they are done
+        self._evictions: Set[asyncio.Task] = set()
+        # set by the healthcheck subscriber when new health data is available
+        self._update_event = asyncio.Event()
+        # the health content of the last broadcast, without its timestamp, an
+        # unchanged health isn't sent again
+        self._last_health_key: tuple | None = None
+        # the HealthSchema layout, refilled and encoded on every broadcast
+        self._health_template: Dict[str, Dict[str, Any]] = {
+            "health": {
+                "timestamp": 0,
+                "process_state": ProcessStateEnum.UNKNOWN,
+                "process_id": 0,
+                "status": {},
+            }
+        }
 
     def __call__(self, *args: Any, **kwds: Any) -> Any:
         pass
@@ -35,23 +66,104 @@ class WSConnectionManager:
         logger.debug("Connecting to %s", websocket)
         if isinstance(websocket, WebSocket):
             await websocket.accept()
-            self.active_connections.append(websocket)
+            self.active_connections.add(websocket)
+            if websocket.query_params.get(WS_COMPRESSION_PARAM) == "zlib":
+                self.compressed_connections.add(websocket)
+            outbox: asyncio.Queue = asyncio.Queue(maxsize=WS_OUTBOX_MAX_SIZE)
+            self.outboxes[websocket] = outbox
+            # push the current status right away, then follow the healthchecks
+            payload = self.build_health_payload()
+            if websocket in self.compressed_connections:
+                payload = zlib.compress(payload.encode(), level=1)
+            outbox.put_nowait(payload)
+            self._senders[websocket] = asyncio.create_task(
+                self.send_outbox(websocket, outbox), name="ws_health_sender_task"
+            )
 
     async def disconnect(self, websocket: WebSocket):
         """Disconnect, handles the WS connections."""
-        self.active_connections.remove(websocket)
+        self.active_connections.discard(websocket)
+        self.compressed_connections.discard(websocket)
+        self.outboxes.pop(websocket, None)
+        sender = self._senders.pop(websocket, None)
+        if sender is not None and sender is not asyncio.current_task():
+            sender.cancel()
+
+    async def evict(self, websocket: WebSocket):
+        """Disconnect a WS client that can't keep up with the health updates."""
+        logger.warning("Disconnecting slow WS client %s", websocket)
+        await self.disconnect(websocket)
+        try:
+            await asyncio.wait_for(websocket.close(), timeout=WS_SEND_TIMEOUT)
+        except Exception as ex:  # pylint: disable=broad-except
+            logger.debug("Unable to close the WS client %s: %s", websocket, ex)
+
+    def notify_update(self):
+        """Wake up the broadcaster, new health data is available."""
+        self._update_event.set()
+
+    async def run_broadcaster(self):
+        """Broadcast the health data whenever the healthcheck reports an update."""
+        while True:
+            await self._update_event.wait()
+            self._update_event.clear()
+            await self.broadcast_health_data()
 
     async def broadcast_health_data(self):
         """Broadcast health data to all WS clients."""
+        if not self.active_connections:
+            # nobody is listening, skip the serialization
+            return
+
         logger.debug("Broadcasting health data to %s", self.active_connections)
-        for websocket in self.active_connections:
-            await self.send_health_data(websocket)
+        health_key = self.update_health_template()
+        if health_key == self._last_health_key:
+            # the clients already have this health, new ones got it on connect
+            return
+        self._last_health_key = health_key
 
-    async def send_health_data(self, websocket: WebSocket):
-        """Send health data to the WS client."""
-        logger.debug("Sending health data to %s", websocket)
+        # encode and compress the payload once, every client receives the same frame
+        payload = orjson.dumps(self._health_template).decode()
+        compressed = (
+            zlib.compress(payload.encode(), level=1)
+            if self.compressed_connections
+            else None
+        )
+        for websocket in list(self.active_connections):
+            self.queue_health_data(
+                websocket,
+                compressed if websocket in self.compressed_connections else payload,
+            )
+
+    def queue_health_data(self, websocket: WebSocket, payload: str | bytes):
+        """Queue the health data for the WS client, evict it if it can't keep up."""
+        outbox = self.outboxes.get(websocket)
+        if outbox is None:
+            return
+
+        try:
+            outbox.put_nowait(payload)
+        except asyncio.QueueFull:
+            eviction = asyncio.create_task(self.evict(websocket))
+            self._evictions.add(eviction)
+            eviction.add_done_callback(self._evictions.discard)
+
+    async def send_outbox(self, websocket: WebSocket, outbox: asyncio.Queue):
+        """Send the queued health data to the WS client until it disconnects."""
+        while websocket in self.active_connections:
+            await self.send_health_data(websocket, await outbox.get())
 
-        process_state, pid = Forwarder().get_instance().determine_process_state()
+    def build_health_payload(self) -> str:
+        """Build the JSON encoded health data."""
+        self.update_health_template()
+        return orjson.dumps(self._health_template).decode()
+
+    def update_health_template(self) -> tuple:
+        """Refill the health template, return its content without the timestamp."""
+        # start and stop invalidate the cached state, it can live half an interval
+        process_state, pid = Forwarder().get_instance().cached_process_state(
+            ttl=config.application.healthcheck_interval / 2
+        )
 
         health_status = None
 
@@ -59,23 +171,31 @@ class WSConnectionManager:
             health_status = self.health_history.get_health_data()
         except ValueError:
             logger.error("Unable to retrieve the last health status.")
-            health_data = HealthSchema(
-                health=Health(
-                    process_id=pid,
-                )
-            )
 
-        health_data = HealthSchema(
-            health=Health(
-                timestamp=health_status.timestamp if health_status else 0,
-                process_state=process_state,
-                process_id=pid,
-                status=health_status.status if health_status else {},
-            )
-        )
+        # fill the preallocated HealthSchema shaped dict, no model per tick
+        health = self._health_template["health"]
+        health["timestamp"] = health_status.timestamp if health_status else 0
+        health["process_state"] = process_state
+        health["process_id"] = pid
+        health["status"] = health_status.status if health_status else {}
+
+        return process_state, pid, tuple(health["status"].items())
+
+    async def send_health_data(self, websocket: WebSocket, payload: str | bytes):
+        """Send the health data to the WS client, evict it if it can't keep up."""
+        logger.debug("Sending health data to %s", websocket)
 
-        if websocket in self.active_connections:
-            await websocket.send_json(health_data.dict())
+        if isinstance(payload, bytes):
+            send = websocket.send_bytes(payload)
+        else:
+            send = websocket.send_text(payload)
+        try:
+            await asyncio.wait_for(send, timeout=WS_SEND_TIMEOUT)
+        except asyncio.TimeoutError:
+            await self.evict(websocket)
+        except Exception as ex:  # pylint: disable=broad-except
+            logger.debug("Unable to send health data to %s: %s", websocket, ex)
+            await self.disconnect(websocket)
 
 
 def websocket_broadcast_when_healthcheck(func):
@@ -84,7 +204,7 @@ def websocket_broadcast_when_healthcheck(func):
     @functools.wraps(func)
     def wrapper(self, *args, **kwargs):
         result = func(self, *args, **kwargs)
-        asyncio.create_task(self.ws_manager.broadcast_health_data())
+        self.ws_manager.notify_update()
         return result
 
     return wrapper
@@ -127,8 +247,9 @@ class HealthcheckSubscriber(EventSubscriber):  # pylint: disable=too-few-public-
                     "The healthcheck subscriber %s received config: %s", self.name, data
                 )
 
-            health_data = Health(
-                timestamp=datetime.timestamp(datetime.now()),
+            # the data comes from the healthcheck itself, skip the validation
+            health_data = Health.model_construct(
+                timestamp=time.time(),
                 process_state=ProcessStateEnum.RUNNING,
                 process_id=0,
                 status={
@@ -1,16 +1,32 @@
 """Configuration handler."""
 
 import os
-from typing import Dict, List, Optional
+from typing import Dict, List, Optional, Tuple
 
 import yaml
 from pydantic import BaseModel, StrictInt, model_validator, validator
 
-_instances: Dict[str, "Config"] = {}
+try:
+    # libyaml bindings, several times faster than the pure Python implementation
+    from yaml import CSafeLoader as SafeLoader
+except ImportError:
+    from yaml import SafeLoader  # type: ignore
+
+# the loaded config instances, with the (mtime, size, inode) of the file they come from
+_instances: Dict[str, Tuple[Tuple[int, int, int], "Config"]] = {}
 _file_path = os.path.join(
     os.path.curdir,
     "config.yml",
 )
+# the fields tracking the runtime state, not part of the config file
+_runtime_fields = {"is_healthy", "internet_connected"}
+# the forwarder fields normalized when empty, with the factory of their fallback
+# value so forwarders never share a mutable default
+_forwarder_defaults = (
+    ("forward_hashtags", list),
+    ("excluded_hashtags", list),
+    ("mention_override", lambda: None),
+)
 
 
 # pylint: disable=no-self-argument
@@ -448,6 +464,40 @@ class ConfigSchema(BaseModel):
 
     config: ConfigYAMLSchema
 
+    @classmethod
+    def from_config(cls, config: "Config") -> "ConfigSchema":
+        """Build the schema from a loaded config, skipping the validation."""
+
+        def construct(model: BaseModel) -> BaseModel:
+            return type(model).model_construct(
+                **model.model_dump(exclude=_runtime_fields)
+            )
+
+        return cls.model_construct(
+            config=ConfigYAMLSchema.model_construct(
+                application=construct(config.application),
+                logger=construct(config.logger),
+                api=construct(config.api),
+                telegram=construct(config.telegram),
+                discord=construct(config.discord),
+                openai=construct(config.openai),
+                telegram_forwarders=[
+                    ForwarderConfig.model_construct(
+                        **{
+                            **forwarder,
+                            **{
+                                key: forwarder.get(key) or default_factory()
+                                for key, default_factory in _forwarder_defaults
+                            },
+                        }
+                    )
+                    for forwarder in map(
+                        ForwarderConfig.model_dump, config.telegram_forwarders
+                    )
+                ],
+            )
+        )
+
 
 class Config(BaseModel):
     """Config model."""
@@ -482,7 +532,7 @@ class Config(BaseModel):
         """Load config instance from YAML file."""
         try:
             with open(yaml_file, "r", encoding="utf-8") as stream:
-                config = yaml.safe_load(stream)
+                config = yaml.load(stream, Loader=SafeLoader)
             return cls(**config)  # create the Config object here
         except FileNotFoundError as ex:
             raise FileNotFoundError(f"Config file {yaml_file} not found.") from ex
@@ -510,7 +560,7 @@ class Config(BaseModel):
         """Load config instance from YAML file."""
         try:
             with open(yaml_file, "r", encoding="utf-8") as stream:
-                config = yaml.safe_load(stream)
+                config = yaml.load(stream, Loader=SafeLoader)
             return cls(**config)
         except FileNotFoundError as ex:
             raise FileNotFoundError(f"Config file {yaml_file} not found.") from ex
@@ -520,10 +570,18 @@ class Config(BaseModel):
 
     @classmethod
     def get_instance(cls, version: str = "default") -> "Config":
-        """Get config instance."""
-        if version not in _instances.items():
-            _instances[version] = cls.load_instance(_file_path)
-        return _instances[version]
+        """Get config instance, reloading it only when the config file changed."""
+        try:
+            stat = os.stat(_file_path)
+        except FileNotFoundError as ex:
+            raise FileNotFoundError(f"Config file {_file_path} not found.") from ex
+
+        file_signature = (stat.st_mtime_ns, stat.st_size, stat.st_ino)
+        instance = _instances.get(version)
+        if instance is None or instance[0] != file_signature:
+            instance = file_signature, cls.load_instance(_file_path)
+            _instances[version] = instance
+        return instance[1]
 
     def get_telegram_channel_by_forwarder_name(self, forwarder_name: str):
         """Get the Telegram channel ID associated with a given forwarder ID."""
@@ -1,24 +1,30 @@
 """A `bridge` to forward messages from Telegram to a Discord server."""
 
 import asyncio
+import io
 import os
 import sys
-from typing import List
+from typing import Dict, FrozenSet, List, Optional, Set
 
+import aiofiles.os
 import discord
 from discord import Message as DiscordMessage
 from telethon import TelegramClient, events
 from telethon.tl.types import (
     Channel,
     InputChannel,
+    InputPeerChannel,
     Message,
     MessageEntityHashtag,
     MessageEntityTextUrl,
     MessageEntityUrl,
+    MessageMediaWebPage,
+    PeerChannel,
 )
 
 from bridge.config import Config, ForwarderConfig
 from bridge.discord import DiscordHandler
+from bridge.events import EventDispatcher
 from bridge.history import MessageHistoryHandler
 from bridge.logger import Logger
 from bridge.openai.handler import OpenAIHandler
@@ -27,6 +33,13 @@ from bridge.utils import telegram_entities_to_markdown
 config = Config.get_instance()
 logger = Logger.get_logger(config.application.name)
 
+# The maximum size, in bytes, of the media downloaded in memory rather than to disk
+MEDIA_MAX_MEMORY_SIZE = 20 * 1024 * 1024
+# The maximum number of media downloaded from Telegram at the same time
+MEDIA_MAX_CONCURRENT_DOWNLOADS = 4
+
+_download_semaphore = asyncio.Semaphore(MEDIA_MAX_CONCURRENT_DOWNLOADS)
+
 
 class Bridge:
     """Bridge between Telegram and Discord."""
@@ -37,11 +50,33 @@ class Bridge:
         self.discord_handler = DiscordHandler()
         self.history_manager = MessageHistoryHandler()
         self.input_channels_entities = []
+        self.forwarders_by_tg_id: Dict[int, List[ForwarderConfig]] = {}
+        self.discord_channels: Dict[int, discord.abc.GuildChannel] = {}
+        # per forwarder name, the lowercased configured hashtags and their
+        # override_mention_everyone flag
+        self.forward_hashtags: Dict[str, FrozenSet[str]] = {}
+        self.forward_hashtags_mention_everyone: Dict[str, Dict[str, bool]] = {}
+        self.excluded_hashtags: Dict[str, FrozenSet[str]] = {}
+        self.mention_overrides: Dict[str, Dict[str, List[str]]] = {}
+        # per Telegram channel ID, every hashtag its forwarders filter or mention on
+        self.hashtags_by_tg_id: Dict[int, Set[str]] = {}
+        # set by the healthcheck events when internet and Telegram come back, the
+        # bridge starts disconnected so the first healthy check recovers right away
+        self._connected = False
+        self._connectivity_restored = asyncio.Event()
 
         logger.debug("Forwarders: %s", config.telegram_forwarders)
 
     async def start(self):
         """Start the bridge."""
+        self._index_forwarders()
+        EventDispatcher().add_subscriber("healthcheck", self)
+        self.discord_client.add_listener(
+            self._on_discord_channel_delete, "on_guild_channel_delete"
+        )
+        self.discord_client.add_listener(self._on_discord_ready, "on_ready")
+        if self.discord_client.is_ready():
+            await self._on_discord_ready()
         await self._register_forwarders()
         await self._register_telegram_handlers()
 
@@ -55,6 +90,62 @@ class Bridge:
         #     await self.handle_new_message(event)
         # self.discord_client.add_listener(self._handle_discord_message, "on_message")
 
+    def _index_forwarders(self):
+        """Index the forwarders by Telegram channel ID and lowercased hashtags."""
+        self.forwarders_by_tg_id = {}
+        self.hashtags_by_tg_id = {}
+        for forwarder in config.telegram_forwarders:
+            self.forwarders_by_tg_id.setdefault(forwarder.tg_channel_id, []).append(
+                forwarder
+            )
+
+            name = forwarder.forwarder_name
+            override_mention_everyone = {
+                tag["name"].lower(): tag.get("override_mention_everyone", False)
+                for tag in forwarder.forward_hashtags or []
+            }
+            self.forward_hashtags[name] = frozenset(override_mention_everyone)
+            self.forward_hashtags_mention_everyone[name] = override_mention_everyone
+            self.excluded_hashtags[name] = frozenset(
+                tag["name"].lower() for tag in forwarder.excluded_hashtags or []
+            )
+            mention_override: Dict[str, List[str]] = {}
+            for override in forwarder.mention_override or []:
+                mention_override.setdefault(override["tag"].lower(), []).extend(
+                    override["roles"]
+                )
+            self.mention_overrides[name] = mention_override
+
+            self.hashtags_by_tg_id.setdefault(forwarder.tg_channel_id, set()).update(
+                self.forward_hashtags[name],
+                self.excluded_hashtags[name],
+                mention_override,
+            )
+
+    async def _on_discord_ready(self):
+        """Resolve the Discord channels of the forwarders once the client is ready."""
+        self.discord_channels.clear()
+        for forwarder in config.telegram_forwarders:
+            if self.get_discord_channel(forwarder.discord_channel_id) is None:
+                logger.warning(
+                    "Discord channel %s of forwarder %s not found",
+                    forwarder.discord_channel_id,
+                    forwarder.forwarder_name,
+                )
+
+    async def _on_discord_channel_delete(self, channel: discord.abc.GuildChannel):
+        """Drop a deleted Discord channel from the channels cache."""
+        self.discord_channels.pop(channel.id, None)
+
+    def get_discord_channel(self, channel_id: int):
+        """Get a Discord channel, caching the lookup by channel ID."""
+        discord_channel = self.discord_channels.get(channel_id)
+        if discord_channel is None:
+            discord_channel = self.discord_client.get_channel(channel_id)
+            if discord_channel is not None:
+                self.discord_channels[channel_id] = discord_channel  # type: ignore
+        return discord_channel
+
     async def _register_forwarders(self):
         """Register the forwarders."""
         logger.info("Registering forwarders...")
@@ -65,35 +156,35 @@ class Bridge:
             await self._register_forwarders()
             return
 
-        logger.debug("Iterating dialogs...")
         try:
-            async for dialog in self.telegram_client.iter_dialogs():
-                if not isinstance(dialog.entity, Channel) and not isinstance(
-                    dialog.entity, InputChannel
-                ):
-                    if config.telegram.log_unhandled_dialogs:
-                        logger.warning(
-                            "Excluded dialog name: %s, id: %s, type: %s",
-                            dialog.name,
-                            dialog.entity.id,
-                            type(dialog.entity),
-                        )
-                    continue
+            # the session file persists the access hash of every channel seen, so the
+            # configured channels resolve from disk without walking the dialogs
+            tg_channel_ids = list(self.forwarders_by_tg_id)
+            input_entities = await asyncio.gather(
+                *(
+                    self.telegram_client.get_input_entity(PeerChannel(tg_channel_id))
+                    for tg_channel_id in tg_channel_ids
+                ),
+                return_exceptions=True,
+            )
 
-                for forwarder in config.telegram_forwarders:
-                    # type: ignore
-                    if forwarder.tg_channel_id in {dialog.name, dialog.entity.id}:
-                        self.input_channels_entities.append(
-                            InputChannel(dialog.entity.id, dialog.entity.access_hash)
-                        )  # type: ignore
-
-                        logger.info(
-                            "Registered Forwarder %s: Telegram channel '%s' (ID %s) with Discord Channel %s",
-                            forwarder.forwarder_name,
-                            dialog.name,
-                            dialog.entity.id,
-                            forwarder.discord_channel_id,
-                        )  # type: ignore
+            unresolved_channel_ids = set()
+            for tg_channel_id, input_entity in zip(tg_channel_ids, input_entities):
+                if isinstance(input_entity, InputPeerChannel):
+                    self._register_channel(
+                        input_entity.channel_id, input_entity.access_hash
+                    )
+                else:
+                    logger.debug(
+                        "Telegram channel %s not resolved: %s",
+                        tg_channel_id,
+                        input_entity,
+                    )
+                    unresolved_channel_ids.add(tg_channel_id)
+
+            if unresolved_channel_ids:
+                logger.debug("Iterating dialogs...")
+                await self._register_dialogs(unresolved_channel_ids)
 
             if len(self.input_channels_entities) <= 0:
                 logger.error("No channel matching found, exiting...")
@@ -103,6 +194,51 @@ class Bridge:
             logger.error("Error while registering forwarders: %s", ex)
             sys.exit(1)
 
+    async def _register_dialogs(self, tg_channel_ids: Set[int]):
+        """Register the forwarders of the given channels by iterating the dialogs."""
+        pending_channel_ids = set(tg_channel_ids)
+        async for dialog in self.telegram_client.iter_dialogs():
+            if not isinstance(dialog.entity, Channel) and not isinstance(
+                dialog.entity, InputChannel
+            ):
+                if config.telegram.log_unhandled_dialogs:
+                    logger.warning(
+                        "Excluded dialog name: %s, id: %s, type: %s",
+                        dialog.name,
+                        dialog.entity.id,
+                        type(dialog.entity),
+                    )
+                continue
+
+            if dialog.entity.id in pending_channel_ids:
+                pending_channel_ids.discard(dialog.entity.id)
+            elif dialog.name in pending_channel_ids:
+                pending_channel_ids.discard(dialog.name)  # type: ignore
+            else:
+                continue
+
+            self._register_channel(
+                dialog.entity.id, dialog.entity.access_hash, dialog.name
+            )
+            # stop paging through the dialogs once every channel is found
+            if not pending_channel_ids:
+                break
+
+    def _register_channel(
+        self, channel_id: int, access_hash: int, name: Optional[str] = None
+    ):
+        """Listen to a Telegram channel and log its forwarders."""
+        self.input_channels_entities.append(InputChannel(channel_id, access_hash))
+
+        for forwarder in self.forwarders_by_tg_id.get(channel_id, []):
+            logger.info(
+                "Registered Forwarder %s: Telegram channel '%s' (ID %s) with Discord Channel %s",
+                forwarder.forwarder_name,
+                name or channel_id,
+                channel_id,
+                forwarder.discord_channel_id,
+            )
+
     async def _register_telegram_handlers(self):
         """Register the Telegram handlers."""
         logger.info("Registering Telegram handlers...")
@@ -163,126 +299,188 @@ class Bridge:
         logger.debug("Found %s matching forwarders", len(matching_forwarders))
         logger.debug("Matching forwarders: %s", matching_forwarders)
 
-        for forwarder in matching_forwarders:
-            logger.debug("Forwarder config: %s", forwarder)
-
-            should_forward_message = forwarder.forward_everything
-            mention_everyone = forwarder.mention_everyone
-            message_forward_hashtags: List[str] = []
+        # the hashtags only depend on the message, extract them once and only
+        # those a forwarder filters or mentions on
+        message_forward_hashtags: FrozenSet[str] = frozenset()
+        channel_hashtags = self.hashtags_by_tg_id.get(tg_channel_id)
+        if channel_hashtags:
+            message_forward_hashtags = self.get_message_forward_hashtags(
+                message, channel_hashtags
+            )
+        message_texts: Dict[tuple, asyncio.Future] = {}
+        message_media: Dict[int, asyncio.Future] = {}
+
+        results = await asyncio.gather(
+            *(
+                self._forward_one(
+                    message,
+                    forwarder,
+                    message_forward_hashtags,
+                    message_texts,
+                    message_media,
+                )
+                for forwarder in matching_forwarders
+            ),
+            return_exceptions=True,
+        )
 
-            if not should_forward_message or forwarder.mention_override:
-                message_forward_hashtags = self.get_message_forward_hashtags(message)
+        # when every forwarder failed before sending, nobody awaited the shared
+        # download, stop it and retrieve its outcome so it isn't reported as lost
+        for media_download in message_media.values():
+            if not media_download.done():
+                media_download.cancel()
+            elif not media_download.cancelled():
+                media_download.exception()
 
-                logger.debug("message_forward_hashtags: %s", message_forward_hashtags)
+        for forwarder, result in zip(matching_forwarders, results):
+            if isinstance(result, Exception):
+                logger.error(
+                    "Error while forwarding TG message %s with forwarder %s: %s",
+                    message.id,
+                    forwarder.forwarder_name,
+                    result,
+                    exc_info=config.application.debug,
+                )
 
-                logger.debug("mention_override: %s", forwarder.mention_override)
+    async def _forward_one(
+        self,
+        message: Message,
+        forwarder: ForwarderConfig,
+        message_forward_hashtags: FrozenSet[str],
+        message_texts: Dict[tuple, asyncio.Future],
+        message_media: Dict[int, asyncio.Future],
+    ):  # pylint: disable=too-many-branches,too-many-locals
+        """Forward a Telegram message to the Discord channel of a single forwarder."""
+        logger.debug("Forwarder config: %s", forwarder)
+        forwarder_name = forwarder.forwarder_name
+        discord_channel_id = forwarder.discord_channel_id
 
-                logger.debug("forward_hashtags: %s", forwarder.forward_hashtags)
+        should_forward_message = forwarder.forward_everything
+        mention_everyone = forwarder.mention_everyone
 
-                matching_forward_hashtags = []
+        if not should_forward_message or forwarder.mention_override:
+            logger.debug("message_forward_hashtags: %s", message_forward_hashtags)
 
-                if message_forward_hashtags and forwarder.forward_hashtags:
-                    matching_forward_hashtags = [
-                        tag
-                        for tag in forwarder.forward_hashtags
-                        if tag["name"].lower() in message_forward_hashtags
-                    ]
+            logger.debug("mention_override: %s", forwarder.mention_override)
 
-                if len(matching_forward_hashtags) > 0:
-                    should_forward_message = True
-                    mention_everyone = any(
-                        tag.get("override_mention_everyone", False)
-                        for tag in matching_forward_hashtags
-                    )
+            logger.debug("forward_hashtags: %s", forwarder.forward_hashtags)
 
-            if forwarder.excluded_hashtags:
-                message_forward_hashtags = self.get_message_forward_hashtags(message)
+            forward_hashtags = self.forward_hashtags.get(forwarder_name, frozenset())
+            matching_forward_hashtags = message_forward_hashtags & forward_hashtags
 
-                matching_forward_hashtags = [
-                    tag
-                    for tag in forwarder.excluded_hashtags
-                    if tag["name"].lower() in message_forward_hashtags
+            if matching_forward_hashtags:
+                should_forward_message = True
+                tags_mention_everyone = self.forward_hashtags_mention_everyone[
+                    forwarder_name
                 ]
+                mention_everyone = any(
+                    tags_mention_everyone[tag] for tag in matching_forward_hashtags
+                )
 
-                if len(matching_forward_hashtags) > 0:
-                    should_forward_message = False
+        excluded_hashtags = self.excluded_hashtags.get(forwarder_name)
+        if excluded_hashtags and not excluded_hashtags.isdisjoint(
+            message_forward_hashtags
+        ):
+            should_forward_message = False
 
-            if not should_forward_message:
-                continue
+        if not should_forward_message:
+            return
 
-            discord_channel = self.discord_client.get_channel(
-                forwarder.discord_channel_id
-            )  # type: ignore
-            server_roles = discord_channel.guild.roles  # type: ignore
+        discord_channel = self.get_discord_channel(discord_channel_id)
 
-            mention_roles = self.discord_handler.get_mention_roles(
-                message_forward_hashtags,
-                forwarder.mention_override,
-                config.discord.built_in_roles,
-                server_roles,
+        # start the media download, shared by all the forwarders, so it runs
+        # while the message text is being processed
+        if message.id not in message_media and self.is_in_memory_media(message):
+            message_media[message.id] = asyncio.ensure_future(
+                self.download_media_in_memory(message)
             )
 
-            message_text = await self.process_message_text(
-                message,
-                forwarder.strip_off_links,
-                mention_everyone,
-                mention_roles,
-                config.openai.enabled,
+        mention_roles: List[str] = []
+        mention_override_tags = self.mention_overrides.get(forwarder_name)
+        if mention_override_tags and message_forward_hashtags:
+            mention_overrides = self.discord_handler.get_mention_overrides(
+                discord_channel.guild,  # type: ignore
+                forwarder_name,
+                mention_override_tags,
+                config.discord.built_in_roles,
+            )
+            mention_roles = self.discord_handler.get_mention_roles(
+                message_forward_hashtags, mention_overrides
             )
 
-            if message.reply_to and message.reply_to.reply_to_msg_id:
-                discord_reference = (
-                    await self.discord_handler.fetch_reference(
-                        message, forwarder.forwarder_name, discord_channel
-                    )
-                    if message.reply_to.reply_to_msg_id
-                    else None
+        # forwarders sharing the same text options reuse a single rendering
+        text_key = (
+            forwarder.strip_off_links,
+            mention_everyone,
+            frozenset(mention_roles),
+        )
+        if text_key not in message_texts:
+            message_texts[text_key] = asyncio.ensure_future(
+                self.process_message_text(
+                    message,
+                    forwarder.strip_off_links,
+                    mention_everyone,
+                    mention_roles,
+                    config.openai.enabled,
                 )
-            else:
-                discord_reference = None
+            )
+        message_text = await message_texts[text_key]
 
-            if message.media:
-                sent_discord_messages = await self.handle_message_media(
-                    message, discord_channel, message_text, discord_reference
+        if message.reply_to and message.reply_to.reply_to_msg_id:
+            discord_reference = (
+                await self.discord_handler.fetch_reference(
+                    message, forwarder_name, discord_channel
                 )
-            else:
-                sent_discord_messages = await self.discord_handler.forward_message(
-                    discord_channel,  # type: ignore
-                    message_text,
-                    reference=discord_reference,
-                )  # type: ignore
+                if message.reply_to.reply_to_msg_id
+                else None
+            )
+        else:
+            discord_reference = None
 
-            if sent_discord_messages:
-                logger.debug(
-                    "Forwarded TG message %s to Discord channel %s",
-                    sent_discord_messages[0].id,
-                    forwarder.discord_channel_id,
-                )
+        if message.media:
+            sent_discord_messages = await self.handle_message_media(
+                message,
+                discord_channel,
+                message_text,
+                discord_reference,
+                message_media.get(message.id),
+            )
+        else:
+            sent_discord_messages = await self.discord_handler.forward_message(
+                discord_channel,  # type: ignore
+                message_text,
+                reference=discord_reference,
+            )  # type: ignore
 
-                logger.debug(
-                    "Saving mapping data for forwarder %s", forwarder.forwarder_name
-                )
-                main_sent_discord_message = sent_discord_messages[0]
-                await self.history_manager.save_mapping_data(
-                    forwarder.forwarder_name, message.id, main_sent_discord_message.id
-                )
-                logger.info(
-                    "Forwarded TG message %s to Discord message %s",
-                    message.id,
-                    main_sent_discord_message.id,
-                )
-            else:
-                await self.history_manager.save_missed_message(
-                    forwarder.forwarder_name,
-                    message.id,
-                    forwarder.discord_channel_id,
-                    None,
-                )
-                logger.error(
-                    "Failed to forward TG message %s to Discord",
-                    message.id,
-                    exc_info=config.application.debug,
-                )
+        if sent_discord_messages:
+            logger.debug(
+                "Forwarded TG message %s to Discord channel %s",
+                sent_discord_messages[0].id,
+                discord_channel_id,
+            )
+
+            logger.debug("Saving mapping data for forwarder %s", forwarder_name)
+            main_sent_discord_message = sent_discord_messages[0]
+            await self.history_manager.save_mapping_data(
+                forwarder_name, message.id, main_sent_discord_message.id
+            )
+            logger.info(
+                "Forwarded TG message %s to Discord message %s",
+                message.id,
+                main_sent_discord_message.id,
+            )
+        else:
+            await self.history_manager.save_missed_message(
+                forwarder_name,
+                message.id,
+                discord_channel_id,
+                None,
+            )
+            logger.error(
+                "Failed to forward TG message %s to Discord",
+                message.id,
+                exc_info=config.application.debug,
+            )
 
     async def _handle_edit_message(self, event):
         """Handle the processing of a Telegram edited message."""
@@ -325,9 +523,7 @@ class Bridge:
 
             logger.debug("Discord message ID: %s", discord_message_id)
 
-            discord_channel = self.discord_client.get_channel(
-                forwarder.discord_channel_id
-            )
+            discord_channel = self.get_discord_channel(forwarder.discord_channel_id)
 
             if discord_channel is None:
                 logger.error("Discord channel not found, skipping...")
@@ -395,9 +591,7 @@ class Bridge:
 
                 logger.debug("Discord message ID: %s", discord_message_id)
 
-                discord_channel = self.discord_client.get_channel(
-                    forwarder.discord_channel_id
-                )
+                discord_channel = self.get_discord_channel(forwarder.discord_channel_id)
 
                 if discord_channel is None:
                     logger.error(
@@ -443,26 +637,24 @@ class Bridge:
 
     def get_matching_forwarders(self, tg_channel_id: int) -> List[ForwarderConfig]:
         """Get the forwarders that match the given Telegram channel ID."""
-        return [
-            forwarder_config
-            for forwarder_config in config.telegram_forwarders
-            if tg_channel_id == forwarder_config["tg_channel_id"]
-        ]  # pylint: disable=line-too-long
+        return self.forwarders_by_tg_id.get(tg_channel_id, [])
 
     @staticmethod
-    def get_message_forward_hashtags(message: Message):
-        """Get forward_hashtags from a message."""
+    def get_message_forward_hashtags(
+        message: Message, relevant_hashtags: Set[str]
+    ) -> FrozenSet[str]:
+        """Get the lowercased message hashtags found in the relevant hashtags."""
         if not message.entities:
-            return []
-        entities = message.entities or []
-        forward_hashtags = [
-            entity for entity in entities if isinstance(entity, MessageEntityHashtag)
-        ]
+            return frozenset()
 
-        return [
-            message.message[hashtag.offset : hashtag.offset + hashtag.length]
-            for hashtag in forward_hashtags
-        ]  # pylint: disable=line-too-long
+        message_hashtags = (
+            message.message[entity.offset : entity.offset + entity.length].lower()
+            for entity in message.entities
+            if isinstance(entity, MessageEntityHashtag)
+        )
+        return frozenset(
+            hashtag for hashtag in message_hashtags if hashtag in relevant_hashtags
+        )
 
     @staticmethod
     async def process_message_text(
@@ -473,70 +665,138 @@ class Bridge:
         openai_enabled: bool,
     ) -> str:  # pylint: disable=too-many-arguments
         """Process the message text and return the processed text."""
-
         if message.entities:
             message_text = telegram_entities_to_markdown(message, strip_off_links)
         else:
             message_text = message.message
 
+        # most messages have nothing appended or prepended
+        if not (openai_enabled or mention_everyone or mention_roles):
+            return message_text
+
         if openai_enabled:
             suggestions = await OpenAIHandler.analyze_message_sentiment(message.message)
             message_text = f"{message_text}\n{suggestions}"
 
         if mention_everyone:
-            message_text += "\n" + "@everyone"
+            message_text = f"{message_text}\n@everyone"
 
         if mention_roles:
-            mention_text = ", ".join(role for role in mention_roles)
-            message_text = f"{mention_text}\n{message_text}"
+            message_text = f"{', '.join(mention_roles)}\n{message_text}"
 
         return message_text
 
+    @staticmethod
+    def message_contains_url(message: Message) -> bool:
+        """Check whether the message is a link preview or its text contains a URL."""
+        if isinstance(message.media, MessageMediaWebPage):
+            return True
+
+        return any(
+            isinstance(entity, (MessageEntityTextUrl, MessageEntityUrl))
+            for entity in message.entities or []
+        )
+
+    @staticmethod
+    def is_in_memory_media(message: Message) -> bool:
+        """Check whether the message media is small enough to be kept in memory."""
+        if not message.media or Bridge.message_contains_url(message):
+            return False
+
+        media_file = message.file
+        return media_file is not None and (media_file.size or 0) <= MEDIA_MAX_MEMORY_SIZE
+
+    async def download_media_in_memory(self, message: Message) -> bytes | None:
+        """Download the message media in memory."""
+        async with _download_semaphore:
+            return await self.telegram_client.download_media(message, file=bytes)
+
     async def process_media_message(
-        self, message: Message, discord_channel, message_text, discord_reference
+        self,
+        message: Message,
+        discord_channel,
+        message_text,
+        discord_reference,
+        media_download: Optional[asyncio.Future] = None,
     ) -> List[DiscordMessage] | None:
         """Process a message that contains media."""
-        file_path = await self.telegram_client.download_media(message)
-        try:
-            with open(file_path, "rb") as image_file:  # type: ignore
-                sent_discord_messages = await self.discord_handler.forward_message(
-                    discord_channel,
-                    message_text,
-                    image_file=image_file,
-                    reference=discord_reference,
-                )
-                if not sent_discord_messages:
-                    logger.error("Failed to send message to Discord")
-                    return
+        media_file = message.file
+        if self.is_in_memory_media(message):
+            # small media is kept in memory and streamed to Discord directly
+            if media_download is not None:
+                # the download is shared, a cancelled forwarder must not cancel it
+                media = await asyncio.shield(media_download)
+            else:
+                media = await self.download_media_in_memory(message)
+            if media is None:
+                logger.error("Failed to download the media of message %s", message.id)
+                return
 
+            sent_discord_messages = await self.discord_handler.forward_message(
+                discord_channel,
+                message_text,
+                image_file=io.BytesIO(media),  # type: ignore
+                filename=media_file.name or f"media{media_file.ext or ''}",
+                reference=discord_reference,
+            )
+            if not sent_discord_messages:
+                logger.error("Failed to send message to Discord")
+                return
+
+            return sent_discord_messages
+
+        async with _download_semaphore:
+            file_path = await self.telegram_client.download_media(message)
+        if file_path is None:
+            logger.error("Failed to download the media of message %s", message.id)
+            return
+
+        # large media stay on disk, the file is streamed to Discord as it is sent
+        try:
+            image_file = await asyncio.to_thread(open, file_path, "rb")
         except OSError as ex:
             logger.error(
                 "An error occurred while opening the file %s: %s", file_path, ex
             )
+            await aiofiles.os.remove(file_path)
             return
+
+        try:
+            sent_discord_messages = await self.discord_handler.forward_message(
+                discord_channel,
+                message_text,
+                image_file=image_file,
+                filename=os.path.basename(file_path),
+                reference=discord_reference,
+            )
         finally:
-            os.remove(file_path)  # type: ignore
+            image_file.close()
+            await aiofiles.os.remove(file_path)
+
+        if not sent_discord_messages:
+            logger.error("Failed to send message to Discord")
+            return
 
         return sent_discord_messages
 
     async def handle_message_media(
-        self, message: Message, discord_channel, message_text, discord_reference
+        self,
+        message: Message,
+        discord_channel,
+        message_text,
+        discord_reference,
+        media_download: Optional[asyncio.Future] = None,
     ) -> List[DiscordMessage] | None:
         """Handle a message that contains media."""
-        contains_url = any(
-            isinstance(entity, (MessageEntityTextUrl, MessageEntityUrl))
-            for entity in message.entities or []
-        )
-
         sent_discord_messages: List[DiscordMessage] | None = None
 
-        if contains_url:
+        if self.message_contains_url(message):
             sent_discord_messages = await self.process_url_message(
                 discord_channel, message_text, discord_reference
             )
         else:
             sent_discord_messages = await self.process_media_message(
-                message, discord_channel, message_text, discord_reference
+                message, discord_channel, message_text, discord_reference, media_download
             )
 
         return sent_discord_messages
@@ -550,73 +810,94 @@ class Bridge:
         )
         return sent_discord_messages
 
+    def update(self, event: str, data=None):  # pylint: disable=unused-argument
+        """Wake up the missed messages recovery when connectivity is restored."""
+        connected = bool(
+            config.application.internet_connected
+            and config.telegram.is_healthy is True
+        )
+        if connected and not self._connected:
+            self._connectivity_restored.set()
+        self._connected = connected
+
     async def on_restored_connectivity(self):
-        """Check and restore internet connectivity."""
+        """Recover the missed messages periodically and on restored connectivity."""
         logger.debug("Checking for internet connectivity")
-        while True:
-            if (
-                config.application.internet_connected
-                and config.telegram.is_healthy is True
-            ):
-                logger.debug(
-                    "Internet connection active and Telegram is connected, checking for missed messages"
-                )
+        try:
+            while True:
+                # the messages missed while connected are retried every interval,
+                # a restored connectivity triggers the recovery right away
                 try:
-                    last_messages = (
-                        await self.history_manager.get_last_messages_for_all_forwarders()
+                    await asyncio.wait_for(
+                        self._connectivity_restored.wait(),
+                        timeout=config.application.healthcheck_interval,
                     )
+                except asyncio.TimeoutError:
+                    pass
+                self._connectivity_restored.clear()
+
+                if (
+                    config.application.internet_connected
+                    and config.telegram.is_healthy is True
+                ):
+                    await self._recover_missed_messages()
+        finally:
+            # the task is cancelled when the bridge stops, release this bridge
+            EventDispatcher().remove_subscriber("healthcheck", self)
+
+    async def _recover_missed_messages(self):
+        """Forward the messages sent after the last forwarded ones."""
+        logger.debug(
+            "Internet connection active and Telegram is connected, checking for missed messages"
+        )
+        try:
+            last_messages = (
+                await self.history_manager.get_last_messages_for_all_forwarders()
+            )
 
-                    logger.debug("Last forwarded messages: %s", last_messages)
+            logger.debug("Last forwarded messages: %s", last_messages)
 
-                    for last_message in last_messages:
-                        forwarder_name = last_message["forwarder_name"]
-                        last_tg_message_id = last_message["telegram_id"]
+            for last_message in last_messages:
+                forwarder_name = last_message["forwarder_name"]
+                last_tg_message_id = last_message["telegram_id"]
 
-                        channel_id = config.get_telegram_channel_by_forwarder_name(
-                            forwarder_name
+                channel_id = config.get_telegram_channel_by_forwarder_name(
+                    forwarder_name
+                )
+
+                if channel_id:
+                    fetched_messages = await self.history_manager.fetch_messages_after(
+                        last_tg_message_id, channel_id, self.telegram_client
+                    )
+                    for fetched_message in fetched_messages:
+                        logger.debug(
+                            "Recovered message %s from channel %s",
+                            fetched_message.id,
+                            channel_id,
+                        )
+                        event = events.NewMessage.Event(message=fetched_message)
+                        event.peer = await self.telegram_client.get_input_entity(  # type: ignore
+                            channel_id
                         )
 
-                        if channel_id:
-                            fetched_messages = (
-                                await self.history_manager.fetch_messages_after(
-                                    last_tg_message_id, channel_id, self.telegram_client
-                                )
+                        if config.discord.is_healthy is False:
+                            logger.warning(
+                                "Discord is not available despite the connectivty is restored, queing TG message %s",
+                                event.message.id,
                             )
-                            for fetched_message in fetched_messages:
-                                logger.debug(
-                                    "Recovered message %s from channel %s",
-                                    fetched_message.id,
-                                    channel_id,
-                                )
-                                event = events.NewMessage.Event(message=fetched_message)
-                                event.peer = await self.telegram_client.get_input_entity(  # type: ignore
-                                    channel_id
-                                )
-
-                                if config.discord.is_healthy is False:
-                                    logger.warning(
-                                        "Discord is not available despite the connectivty is restored, queing TG message %s",
-                                        event.message.id,
-                                    )
-                                    # await add_to_queue(event)
-                                    continue
-                                # delay the message delivery to avoid rate limit and flood
-                                await asyncio.sleep(config.application.recoverer_delay)
-                                logger.debug(
-                                    "Forwarding recovered Telegram message %s",
-                                    event.message.id,
-                                )
-                                await self._handle_new_message(event)
-
-                except Exception as exception:  # pylint: disable=broad-except
-                    logger.error(
-                        "Failed to fetch missed messages: %s",
-                        exception,
-                        exc_info=config.application.debug,
-                    )
+                            # await add_to_queue(event)
+                            continue
+                        # delay the message delivery to avoid rate limit and flood
+                        await asyncio.sleep(config.application.recoverer_delay)
+                        logger.debug(
+                            "Forwarding recovered Telegram message %s",
+                            event.message.id,
+                        )
+                        await self._handle_new_message(event)
 
-            logger.debug(
-                "on_restored_connectivity will trigger again in for %s seconds",
-                config.application.healthcheck_interval,
+        except Exception as exception:  # pylint: disable=broad-except
+            logger.error(
+                "Failed to fetch missed messages: %s",
+                exception,
+                exc_info=config.application.debug,
             )
-            await asyncio.sleep(config.application.healthcheck_interval)
@@ -1,7 +1,8 @@
 """Discord handler."""
 import asyncio
 import sys
-from typing import List, Optional, Sequence
+from collections import defaultdict
+from typing import Dict, Iterable, List, Mapping, Tuple
 
 import discord
 from discord import Message, MessageReference, TextChannel
@@ -16,6 +17,16 @@ from core import SingletonMeta
 config = Config.get_instance()
 logger = Logger.get_logger(config.application.name)
 
+# The maximum number of concurrent sends to Discord, below the global rate limit.
+DISCORD_MAX_CONCURRENT_SENDS = 40
+# The maximum number of concurrent sends to a single Discord channel.
+DISCORD_CHANNEL_MAX_CONCURRENT_SENDS = 4
+
+_send_semaphore = asyncio.Semaphore(DISCORD_MAX_CONCURRENT_SENDS)
+_channel_send_semaphores = defaultdict(
+    lambda: asyncio.Semaphore(DISCORD_CHANNEL_MAX_CONCURRENT_SENDS)
+)
+
 
 class DiscordHandler(metaclass=SingletonMeta):
     """Discord handler class."""
@@ -24,6 +35,10 @@ class DiscordHandler(metaclass=SingletonMeta):
 
     def __init__(self):
         self.history_manager = MessageHistoryHandler()
+        # guild id -> role name -> role, refreshed on role events
+        self._guild_roles: Dict[int, Dict[str, discord.Role]] = {}
+        # (guild id, forwarder name) -> hashtag -> role mentions
+        self._mention_overrides: Dict[Tuple[int, str], Dict[str, Tuple[str, ...]]] = {}
 
     async def init_client(self) -> discord.Client:
         """Start the Discord client."""
@@ -55,35 +70,68 @@ class DiscordHandler(metaclass=SingletonMeta):
                     http_exception.response.reason,
                 )
 
+        # the handler outlives the bridge restarts, the roles may have changed while
+        # no client was listening and the mention overrides may come from a
+        # changed config
+        self._guild_roles.clear()
+        self._mention_overrides.clear()
+
         discord_client = discord.Client(intents=discord.Intents.default())
+        for event in (
+            "on_guild_role_create",
+            "on_guild_role_update",
+            "on_guild_role_delete",
+        ):
+            discord_client.add_listener(self._on_guild_role_change, event)
+
         _ = asyncio.ensure_future(
             start_discord_client(discord_client, config.discord.bot_token)
         )
 
         return discord_client
 
+    async def _on_guild_role_change(self, role: discord.Role, *_):
+        """Invalidate the cached roles of the guild the role belongs to."""
+        guild_id = role.guild.id
+        self._guild_roles.pop(guild_id, None)
+        for key in [key for key in self._mention_overrides if key[0] == guild_id]:
+            del self._mention_overrides[key]
+
+    def get_guild_roles(self, guild: discord.Guild) -> Dict[str, discord.Role]:
+        """Get the guild roles indexed by name."""
+        roles_by_name = self._guild_roles.get(guild.id)
+        if roles_by_name is None:
+            roles_by_name = {}
+            for role in guild.roles:
+                roles_by_name.setdefault(role.name, role)
+            self._guild_roles[guild.id] = roles_by_name
+        return roles_by_name
+
     @staticmethod
     async def forward_message(
         discord_channel: TextChannel,
         message_text: str,
         image_file=None,
+        filename: str | None = None,
         reference: MessageReference = ...,
     ) -> List[Message]:
         """Send a message to Discord."""
         sent_messages = []
         message_parts = split_message(message_text)
         try:
-            if image_file:
-                discord_file = discord.File(image_file)
-                sent_message = await discord_channel.send(
-                    message_parts[0], file=discord_file, reference=reference
-                )
-                sent_messages.append(sent_message)
-                message_parts.pop(0)
+            # wait for the channel slot before holding one of the global slots
+            async with _channel_send_semaphores[discord_channel.id], _send_semaphore:
+                if image_file:
+                    discord_file = discord.File(image_file, filename=filename)
+                    sent_message = await discord_channel.send(
+                        message_parts[0], file=discord_file, reference=reference
+                    )
+                    sent_messages.append(sent_message)
+                    message_parts.pop(0)
 
-            for part in message_parts:
-                sent_message = await discord_channel.send(part, reference=reference)
-                sent_messages.append(sent_message)
+                for part in message_parts:
+                    sent_message = await discord_channel.send(part, reference=reference)
+                    sent_messages.append(sent_message)
         except discord.Forbidden:
             logger.error(
                 "Discord client doesn't have permission to send messages to channel %s",
@@ -146,40 +194,45 @@ class DiscordHandler(metaclass=SingletonMeta):
             )
             return None
 
-    def get_mention_roles(
+    def get_mention_overrides(
         self,
-        message_forward_hashtags: List[str],
-        mention_override_tags: Optional[List[dict]],
+        guild: discord.Guild,
+        forwarder_name: str,
+        mention_override_tags: Mapping[str, List[str]],
         discord_built_in_roles: List[str],
-        server_roles: Sequence[discord.Role],
+    ) -> Dict[str, Tuple[str, ...]]:
+        """Get the role mentions of each override hashtag of a forwarder."""
+        key = (guild.id, forwarder_name)
+        mention_overrides = self._mention_overrides.get(key)
+        if mention_overrides is None:
+            server_roles = self.get_guild_roles(guild)
+            mention_overrides = {}
+            for tag, role_names in mention_override_tags.items():
+                mentions = []
+                for role_name in role_names:
+                    if self.is_builtin_mention_role(role_name, discord_built_in_roles):
+                        mentions.append("@" + role_name)
+                    else:
+                        role = server_roles.get(role_name)
+                        if role:
+                            mentions.append(role.mention)
+                mention_overrides[tag] = tuple(mentions)
+            self._mention_overrides[key] = mention_overrides
+        return mention_overrides
+
+    @staticmethod
+    def get_mention_roles(
+        message_forward_hashtags: Iterable[str],
+        mention_overrides: Mapping[str, Tuple[str, ...]],
     ) -> List[str]:
         """Get the roles to mention."""
         mention_roles = set()
 
-        for tag in message_forward_hashtags:  # pylint: disable=too-many-nested-blocks
-            logger.debug("Checking mention override for tag %s", tag)
-            logger.debug("mention_override tags %s", mention_override_tags)
-
-            if not mention_override_tags:
-                continue
-
-            for mention_override_tag in mention_override_tags:
-                if tag.lower() == mention_override_tag["tag"].lower():
-                    logger.debug(
-                        "Found mention override for tag %s: %s",
-                        tag,
-                        mention_override_tag["roles"],
-                    )
-
-                    for role_name in mention_override_tag["roles"]:
-                        if self.is_builtin_mention_role(
-                            role_name, discord_built_in_roles
-                        ):
-                            mention_roles.add("@" + role_name)
-                        else:
-                            role = discord.utils.get(server_roles, name=role_name)
-                            if role:
-                                mention_roles.add(role.mention)
+        for tag in message_forward_hashtags:
+            mentions = mention_overrides.get(tag)
+            if mentions:
+                logger.debug("Found mention override for tag %s: %s", tag, mentions)
+                mention_roles.update(mentions)
 
         return list(mention_roles)
 
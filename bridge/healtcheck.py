@@ -68,72 +68,76 @@ class HealthHandler(metaclass=SingletonMeta):
             )
             return False
 
+    async def probe_internet(self) -> bool:
+        """Probe the internet connectivity."""
+        try:
+            has_connectivity = await self.internet_connectivity_check()
+            if has_connectivity:
+                logger.debug("The bridge is online.")
+            else:
+                logger.warning("Unable to reach the internet.")
+            return has_connectivity
+        except Exception as ex:  # pylint: disable=broad-except
+            logger.error(
+                "An error occurred while checking internet connectivity: %s",
+                ex,
+                exc_info=config.application.debug,
+            )
+            return False
+
+    async def probe_telegram(self) -> bool:
+        """Probe the Telegram API status."""
+        try:
+            if self.telegram_client.is_connected():
+                await self.telegram_client.get_me()
+                logger.debug("Telegram API is healthy.")
+                return True
+            return config.telegram.is_healthy
+        except ConnectionError as ex:
+            logger.error("Unable to reach the Telegram API: %s", ex)
+            return False
+        except Exception as ex:  # pylint: disable=broad-except
+            logger.error(
+                "An error occurred while connecting to the Telegram API: %s",
+                ex,
+                exc_info=config.application.debug,
+            )
+            return False
+
+    async def probe_discord(self) -> bool:
+        """Probe the Discord API status."""
+        try:
+            discord_status, is_healthy = self.discord_client_health.report_status(
+                self.discord_client, config.discord.max_latency
+            )
+            if is_healthy:
+                logger.debug("Discord API is healthy.")
+            else:
+                logger.warning(discord_status)
+            return is_healthy
+        except Exception as ex:  # pylint: disable=broad-except
+            logger.error(
+                "An error occurred while connecting to the Discord API: %s",
+                ex,
+                exc_info=config.application.debug,
+            )
+            return False
+
     async def check(self, interval: int = 30):
         """Check the health of the Discord and Telegram APIs periodically."""
-        # Check for internet connectivity
         while True:
-            try:
-                has_connectivity = await self.internet_connectivity_check()
-                if has_connectivity:
-                    logger.debug("The bridge is online.")
-                    # set the internet connectivity status to True
-                    config.application.internet_connected = True
-                else:
-                    logger.warning("Unable to reach the internet.")
-                    # set the internet connectivity status to False
-                    config.application.internet_connected = False
-                    # wait for the specified interval
-                    await asyncio.sleep(interval)
-                    await self.check(interval)
-
-            except Exception as ex:  # pylint: disable=broad-except
-                logger.error(
-                    "An error occurred while checking internet connectivity: %s",
-                    ex,
-                    exc_info=config.application.debug,
-                )
-
-            # Check Telegram API status
-            try:
-                if self.telegram_client.is_connected():
-                    await self.telegram_client.get_me()
-                    logger.debug("Telegram API is healthy.")
-                    # set the Telegram availability status to True
-                    config.telegram.is_healthy = True
-            except ConnectionError as ex:
-                logger.error("Unable to reach the Telegram API: %s", ex)
-                # set the Telegram availability status to False
-                config.telegram.is_healthy = False
-            except Exception as ex:  # pylint: disable=broad-except
-                logger.error(
-                    "An error occurred while connecting to the Telegram API: %s",
-                    ex,
-                    exc_info=config.application.debug,
-                )
-                # set the Telegram availability status to False
-                config.telegram.is_healthy = False
-
-            # Check Discord API status
-            try:
-                discord_status, is_healthy = self.discord_client_health.report_status(
-                    self.discord_client, config.discord.max_latency
-                )
-                if is_healthy:
-                    logger.debug("Discord API is healthy.")
-                    # set the Discord availability status to True
-                    config.discord.is_healthy = True
-                else:
-                    logger.warning(discord_status)
-                    # set the Discord availability status to False
-                    config.discord.is_healthy = False
-            except Exception as ex:  # pylint: disable=broad-except
-                logger.error(
-                    "An error occurred while connecting to the Discord API: %s",
-                    ex,
-                    exc_info=config.application.debug,
-                )
-                # set the Discord availability status to False
-                config.discord.is_healthy = False
+            # The probes are independent round-trips, run them concurrently
+            # so a check takes as long as the slowest probe, not their sum.
+            internet, telegram, discord_api = await asyncio.gather(
+                self.probe_internet(),
+                self.probe_telegram(),
+                self.probe_discord(),
+                return_exceptions=True,
+            )
+
+            config.application.internet_connected = internet is True
+            config.telegram.is_healthy = telegram is True
+            config.discord.is_healthy = discord_api is True
 
             self.dispatcher.notify("healthcheck", config)
             # Sleep for the given interval and retry
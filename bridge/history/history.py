@@ -19,6 +19,12 @@ logger = Logger.get_logger(config.application.name)
 
 MESSAGES_HISTORY_FILE = "messages_history.json"
 MISSED_MESSAGES_HISTORY_FILE = "missed_messages_history.json"
+# The maximum number of messages mapped per forwarder, the oldest are dropped first
+MESSAGES_HISTORY_MAX_SIZE = 100_000
+# The maximum number of missed messages kept per forwarder, the oldest are dropped first
+MISSED_MESSAGES_MAX_SIZE = 10_000
+# How long, in seconds, mapping updates are batched before being written to disk
+MAPPING_FLUSH_DELAY = 0.05
 
 
 class MessageHistoryHandler:
@@ -31,6 +37,11 @@ class MessageHistoryHandler:
             cls._instance = super().__new__(cls)
             cls._mapping_data_cache = None
             cls._lock = asyncio.Lock()
+            # forwarders save concurrently, serialize the file rewrites
+            cls._write_lock = asyncio.Lock()
+            cls._mapping_dirty = False
+            cls._missed_messages_cache = None
+            cls._flush_task = None
         return cls._instance
 
     async def load_mapping_data(self) -> dict:
@@ -64,29 +75,46 @@ class MessageHistoryHandler:
             discord_message_id,
         )
 
-        if forwarder_name not in mapping_data:
-            mapping_data[forwarder_name] = {}
-
-        mapping_data[forwarder_name][tg_message_id] = discord_message_id
-        try:
-            async with aiofiles.open(
-                MESSAGES_HISTORY_FILE, "w", encoding="utf-8"
-            ) as messages_mapping:
-                await messages_mapping.write(json.dumps(mapping_data, indent=4))
-
-            self._mapping_data_cache = mapping_data
-
-            logger.debug("Mapping data saved successfully.")
-
-            if config.application.debug:
-                logger.debug("Current mapping data: %s", mapping_data)
+        forwarder_data = mapping_data.setdefault(forwarder_name, {})
+        # dicts keep insertion order, re-inserting keeps the newest mapping last
+        forwarder_data.pop(tg_message_id, None)
+        forwarder_data[tg_message_id] = discord_message_id
+        if len(forwarder_data) > MESSAGES_HISTORY_MAX_SIZE:
+            del forwarder_data[next(iter(forwarder_data))]
+
+        # the cache is updated right away, the file is rewritten in batches
+        self._mapping_dirty = True
+        if self._flush_task is None or self._flush_task.done():
+            self._flush_task = asyncio.ensure_future(self._flush_mapping_data())
+
+    async def _flush_mapping_data(self) -> None:
+        """Write the cached mapping data to the mapping file until it is clean."""
+        while self._mapping_dirty:
+            await asyncio.sleep(MAPPING_FLUSH_DELAY)
+            self._mapping_dirty = False
+            mapping_data = self._mapping_data_cache
+            try:
+                async with self._write_lock, aiofiles.open(
+                    MESSAGES_HISTORY_FILE, "w", encoding="utf-8"
+                ) as messages_mapping:
+                    await messages_mapping.write(json.dumps(mapping_data, indent=4))
+
+                logger.debug("Mapping data saved successfully.")
+
+                if config.application.debug:
+                    logger.debug("Current mapping data: %s", mapping_data)
+
+            except Exception as ex:  # pylint: disable=broad-except
+                logger.error(
+                    "An error occurred while saving mapping data: %s",
+                    ex,
+                    exc_info=config.application.debug,
+                )
 
-        except Exception as ex:  # pylint: disable=broad-except
-            logger.error(
-                "An error occurred while saving mapping data: %s",
-                ex,
-                exc_info=config.application.debug,
-            )
+    async def flush_mapping_data(self) -> None:
+        """Wait for the pending mapping data to be written to the mapping file."""
+        if self._flush_task is not None and not self._flush_task.done():
+            await self._flush_task
 
     async def save_missed_message(
         self,
@@ -96,7 +124,7 @@ class MessageHistoryHandler:
         exception: Any,
     ) -> None:
         """Save the missed message to the missed messages file."""
-        mapping_data = await self.load_mapping_data()
+        missed_messages = await self.load_missed_messages()
 
         logger.debug(
             "Saving missed message: %s, %s, %s, %s",
@@ -106,20 +134,24 @@ class MessageHistoryHandler:
             exception,
         )
 
-        if forwarder_name not in mapping_data:
-            mapping_data[forwarder_name] = {}
+        forwarder_missed = missed_messages.setdefault(forwarder_name, {})
+        forwarder_missed.pop(tg_message_id, None)
+        forwarder_missed[tg_message_id] = discord_channel_id, exception
+        if len(forwarder_missed) > MISSED_MESSAGES_MAX_SIZE:
+            del forwarder_missed[next(iter(forwarder_missed))]
 
-        mapping_data[forwarder_name][tg_message_id] = discord_channel_id, exception
         try:
-            async with aiofiles.open(
+            async with self._write_lock, aiofiles.open(
                 MISSED_MESSAGES_HISTORY_FILE, "w", encoding="utf-8"
             ) as missed_messages_mapping:
-                await missed_messages_mapping.write(json.dumps(mapping_data, indent=4))
+                await missed_messages_mapping.write(
+                    json.dumps(missed_messages, indent=4)
+                )
 
             logger.debug("Missed message saved successfully.")
 
             if config.application.debug:
-                logger.debug("Current missed messages data: %s", mapping_data)
+                logger.debug("Current missed messages data: %s", missed_messages)
 
         except Exception as ex:  # pylint: disable=broad-except
             logger.error(
@@ -128,6 +160,22 @@ class MessageHistoryHandler:
                 exc_info=config.application.debug,
             )
 
+    async def load_missed_messages(self) -> dict:
+        """Load the missed messages from the missed messages file."""
+        async with self._lock:
+            if self._missed_messages_cache is None:
+                try:
+                    async with aiofiles.open(
+                        MISSED_MESSAGES_HISTORY_FILE, "r", encoding="utf-8"
+                    ) as missed_messages_mapping:
+                        self._missed_messages_cache = json.loads(
+                            await missed_messages_mapping.read()
+                        )
+                except FileNotFoundError:
+                    self._missed_messages_cache = {}
+
+            return self._missed_messages_cache
+
     async def get_discord_message_id(
         self, forwarder_name: str, tg_message_id: int
     ) -> Optional[int]:
@@ -2,6 +2,7 @@
 import asyncio
 import json
 import os
+import time
 from asyncio.events import AbstractEventLoop
 
 from telethon import TelegramClient
@@ -17,14 +18,27 @@ from bridge.events import EventDispatcher
 from bridge.logger import Logger
 from core import SingletonMeta
 
+try:
+    # watchfiles ships with uvicorn[standard]
+    from watchfiles import awatch
+except ImportError:
+    awatch = None
+
 config = Config.get_instance()
 logger = Logger.get_logger(config.application.name)
 
+# How long, in seconds, a polled session state is reused
+SESSION_CACHE_TTL = 1.0
+
 
 class TelegramHandler(metaclass=SingletonMeta):
     """Telegram handler class."""
 
     dispatcher: EventDispatcher
+    # kept in sync by watch_session_files, None when the files aren't watched
+    session_available: bool | None = None
+    # the last polled session state and when it expires
+    _session_cache: tuple[bool, float] | None = None
 
     def __init__(self, dispatcher: EventDispatcher):
         """Initialize the handler."""
@@ -35,12 +49,60 @@ class TelegramHandler(metaclass=SingletonMeta):
     # to estabils the user has an active session
     def has_session_file(self) -> bool:
         """Check if the Telegram session file exists."""
+        if self.session_available is not None:
+            return self.session_available
+
+        now = time.monotonic()
+        if self._session_cache is not None and now < self._session_cache[1]:
+            return self._session_cache[0]
+
+        session_available = self._stat_session_files()
+        self._session_cache = (session_available, now + SESSION_CACHE_TTL)
+        return session_available
+
+    def invalidate_session_cache(self):
+        """Drop the polled session state, the next check stats the files again."""
+        self._session_cache = None
+
+    @staticmethod
+    def _stat_session_files() -> bool:
+        """Stat the Telegram session file and the auth file."""
         if os.path.isfile(f"{config.application.name}.session") and os.path.isfile(
             config.api.telegram_auth_file
         ):
             return True
         return False
 
+    async def watch_session_files(self):
+        """Watch the session and auth files to track the session availability."""
+        if awatch is None:
+            logger.debug("watchfiles not available, the session files will be polled")
+            return
+
+        session_files = {
+            os.path.abspath(f"{config.application.name}.session"),
+            os.path.abspath(config.api.telegram_auth_file),
+        }
+        watched_dirs = {os.path.dirname(session_file) for session_file in session_files}
+
+        self.session_available = self._stat_session_files()
+        try:
+            async for _ in awatch(
+                *watched_dirs,
+                watch_filter=lambda _, path: path in session_files,
+                recursive=False,
+            ):
+                self.session_available = self._stat_session_files()
+                logger.debug("Telegram session available: %s", self.session_available)
+        except Exception as ex:  # pylint: disable=broad-except
+            logger.warning(
+                "Unable to watch the Telegram session files: %s",
+                ex,
+                exc_info=config.application.debug,
+            )
+        finally:
+            self.session_available = None
+
     async def _get_creds_from_file(self, key: str) -> str | int:
         """Wait for the auth file to be created and then read a value from it."""
         # Wait for the auth file to be created with a timeout of 120 seconds
@@ -1,5 +1,5 @@
 """Utility functions."""
-from typing import List, Tuple
+from typing import List
 
 from telethon.tl.types import (
     Message,
@@ -11,25 +11,39 @@ from telethon.tl.types import (
     MessageEntityTextUrl,
 )
 
+# The Markdown opening and closing delimiters of each Telegram entity type
+MARKDOWN_DELIMITERS = {
+    MessageEntityBold: ("**", "**"),
+    MessageEntityItalic: ("*", "*"),
+    MessageEntityStrike: ("~~", "~~"),
+    MessageEntityCode: ("`", "`"),
+    MessageEntityPre: ("```", "```"),
+}
+
 
 def split_message(message: str, max_length: int = 2000) -> List[str]:
     """Split a message into multiple messages if it exceeds the max length."""
     if len(message) <= max_length:
         return [message]
 
+    # Walk the message by index, only the parts themselves are sliced out
     message_parts = []
-    while len(message) > max_length:
+    start, length = 0, len(message)
+    while length - start > max_length:
         # Find the last newline before the max length.
-        split_index = message[:max_length].rfind("\n")
+        split_index = message.rfind("\n", start, start + max_length)
         if split_index == -1:
             # If a newline wasn't found, split at the max length.
-            split_index = max_length
+            split_index = start + max_length
+
+        message_parts.append(message[start:split_index])
 
-        message_parts.append(message[:split_index])
-        message = message[split_index:].lstrip()
+        start = split_index
+        while start < length and message[start].isspace():
+            start += 1
 
-    if message:
-        message_parts.append(message)
+    if start < length:
+        message_parts.append(message[start:])
 
     return message_parts
 
@@ -49,78 +63,57 @@ def telegram_entities_to_markdown(message: Message, strip_off_links: bool) -> st
     if not message.entities:
         return message_text
 
-    markdown_map = {
-        MessageEntityBold: ("**", "**"),
-        MessageEntityItalic: ("*", "*"),
-        MessageEntityStrike: ("~~", "~~"),
-        MessageEntityCode: ("`", "`"),
-        MessageEntityPre: ("```", "```"),
-    }
-
-    # Create a list of tuples with start offset, end offset, entity type, and associated data.
-    entities = [
-        (
-            entity.offset,
-            entity.offset + entity.length,
-            type(entity),
-            entity.url if isinstance(entity, MessageEntityTextUrl) else None,
-        )
-        for entity in message.entities
-    ]
-
-    # Sort entities by start offset in descending order.
-    entities = sorted(entities, key=lambda e: e[0], reverse=True)
+    # Telegram offsets count UTF-16 code units, only slice the UTF-16 encoded text
+    # when characters outside the BMP make them differ from the string indices
+    utf16_text = message_text.encode("utf-16-le")
+    if len(utf16_text) == 2 * len(message_text):
 
-    links = []  # To hold link text and URLs
-    link_count = 0  # To count the links and assign reference numbers
+        def text_slice(start: int, end: int | None = None) -> str:
+            return message_text[start:end]
 
-    for start, end, entity_type, url in entities:
-        markdown_delimiters = markdown_map.get(entity_type)  # type: ignore
+    else:
 
-        if markdown_delimiters:
-            message_text, _ = apply_markdown(
-                message_text, start, end, markdown_delimiters
-            )
-        elif url:  # This is a MessageEntityTextUrl.
-            link_count += 1
-            links.append((link_count, message_text[start:end], url))
-            # Replace the link text with plain text followed by the reference number
-            message_text = (
-                message_text[:start]
-                + message_text[start:end]
-                + f" [{link_count}]"
-                + message_text[end:]
+        def text_slice(start: int, end: int | None = None) -> str:
+            return utf16_text[2 * start : None if end is None else 2 * end].decode(
+                "utf-16-le"
             )
 
+    # Collect the delimiters to insert at each offset of the original text, closing
+    # delimiters sort before opening ones at the same offset, and nested entities
+    # open after and close before the entities enclosing them.
+    delimiters = []
+    links = []  # To hold link text and URLs
+    for entity in sorted(message.entities, key=lambda e: e.offset):
+        start, end = entity.offset, entity.offset + entity.length
+        markdown_delimiters = MARKDOWN_DELIMITERS.get(type(entity))  # type: ignore
+
+        if markdown_delimiters:
+            opening_delimiter, closing_delimiter = markdown_delimiters
+        elif isinstance(entity, MessageEntityTextUrl):
+            # Keep the link text followed by the reference number
+            links.append((len(links) + 1, text_slice(start, end), entity.url))
+            opening_delimiter, closing_delimiter = "", f" [{len(links)}]"
+        else:
+            continue
+
+        delimiters.append((start, 1, -end, opening_delimiter))
+        delimiters.append((end, 0, -start, closing_delimiter))
+
+    # Build the text in a single pass over the original message
+    parts = []
+    position = 0
+    for offset, _, _, delimiter in sorted(delimiters, key=lambda d: d[:3]):
+        parts.append(text_slice(position, offset))
+        parts.append(delimiter)
+        position = offset
+    parts.append(text_slice(position))
+
     # Append the links at the end of the message
     if links and not strip_off_links:
-        message_text += "\n\nLinks:"
+        parts.append("\n\nLinks:")
         for link_number, link_text, link in links:
-            message_text += f"\n[{link_number}] {link_text}: {link}"  # Each link on a new line for Discord to parse as embeds
-
-    return message_text
-
-
-def apply_markdown(
-    text: str, start: int, end: int, delimiters: Tuple[str, str]
-) -> Tuple[str, int]:
-    """Applies markdown delimiters to a portion of the text.
+            parts.append(
+                f"\n[{link_number}] {link_text}: {link}"
+            )  # Each link on a new line for Discord to parse as embeds
 
-    Args:
-        text: The text to modify.
-        start: The start index where to apply the markdown.
-        end: The end index where to apply the markdown.
-        delimiters: A tuple with the opening and closing delimiters.
-
-    Returns:
-        A tuple with the modified text and the offset correction.
-    """
-    opening_delimiter, closing_delimiter = delimiters
-    return (
-        text[:start]
-        + opening_delimiter
-        + text[start:end]
-        + closing_delimiter
-        + text[end:],
-        len(opening_delimiter) + len(closing_delimiter),
-    )
+    return "".join(parts)
@@ -5,9 +5,10 @@ import asyncio
 import os
 import signal
 import sys
+import time
 from asyncio import AbstractEventLoop
 from sqlite3 import OperationalError
-from typing import Tuple, TypeAlias
+from typing import Coroutine, Dict, Set, Tuple, TypeAlias
 
 import discord
 import psutil  # pylint: disable=import-error
@@ -19,11 +20,18 @@ from bridge.discord import DiscordHandler
 from bridge.enums import ProcessStateEnum
 from bridge.events import EventDispatcher
 from bridge.healtcheck import HealthHandler
+from bridge.history import MessageHistoryHandler
 from bridge.logger import Logger
 from bridge.release import __version__
 from bridge.telegram import TelegramHandler
 from core import SingletonMeta
 
+try:
+    # faster libuv based event loop, not available on Windows
+    import uvloop
+except ImportError:
+    uvloop = None  # pylint: disable=invalid-name
+
 ERR_API_DISABLED = "API mode is disabled, please use the CLI to start the bridge, or enable it in the config file."
 ERR_API_ENABLED = "API mode is enabled, please use the API to start the bridge, or disable it in the config file."
 
@@ -33,17 +41,12 @@ OperationStatus: TypeAlias = Tuple[ProcessStateEnum, str]
 
 config = Config.get_instance()
 
-# A list of tasks that should be cancelled on shutdown fron API
-forwarder_tasks = [
-    "forwarder_task",
-    "shutdown_task",
-    "on_shutdown_task",
-    "bridge_start_task",
-    "telegram_wait_task",
-    "discord_wait_task",
-    "api_healthcheck_task",
-    "on_restored_connectivity_task",
-]
+# The file holding the forwarder PID, computed once instead of on every lookup
+PID_FILE = f"{config.application.name}.pid"
+# How long, in seconds, a cached process state is reused
+PROCESS_STATE_TTL = 0.5
+# In debug mode, callbacks blocking the event loop longer than this are logged
+SLOW_CALLBACK_DURATION = 0.05
 
 
 class Forwarder(metaclass=SingletonMeta):
@@ -56,6 +59,13 @@ class Forwarder(metaclass=SingletonMeta):
     discord_client: discord.Client
     is_running: bool = False
     logger: Logger
+    # per TTL, the last process state read from the PID file and when it was read,
+    # a reader with a longer TTL doesn't keep a stale state alive for the others
+    _process_state_cache: Dict[float, Tuple[float, ProcessStateEnum, int]]
+    # the running forwarder tasks, cancelled on shutdown from the API
+    tasks: Set[asyncio.Task]
+    # the shutdown started by the first received signal
+    shutdown_task: asyncio.Task | None = None
 
     def __init__(
         self, event_loop: AbstractEventLoop | None = None, is_background: bool = False
@@ -72,11 +82,12 @@ class Forwarder(metaclass=SingletonMeta):
 
         self.logger.info("Initializing the forwarder %s", config.application.name)
         self.dispatcher = EventDispatcher()
+        self.tasks = set()
+        self._process_state_cache = {}
 
-        self.event_loop = event_loop or asyncio.new_event_loop()
-        # configure the event loop
-        self.event_loop.set_debug(config.application.debug)
-        self.event_loop.set_exception_handler(self.__event_loop_exception_handler)
+        self.event_loop = self.__configure_event_loop(
+            event_loop or asyncio.new_event_loop()
+        )
 
         self.is_background = is_background
 
@@ -144,11 +155,8 @@ class Forwarder(metaclass=SingletonMeta):
             )
 
             if self.event_loop is None:
-                try:
-                    self.event_loop = asyncio.get_event_loop()
-                except RuntimeError:
-                    self.logger.warning("No event loop found, creating a new one.")
-                    self.event_loop = asyncio.new_event_loop()
+                self.logger.warning("No event loop found, creating a new one.")
+                self.event_loop = self.__configure_event_loop(asyncio.new_event_loop())
 
             asyncio.set_event_loop(self.event_loop)
 
@@ -160,6 +168,23 @@ class Forwarder(metaclass=SingletonMeta):
         # stop the bridge if start is false
         self.__stop()
 
+    def __configure_event_loop(
+        self, event_loop: AbstractEventLoop
+    ) -> AbstractEventLoop:
+        """Configure the debug mode and exception handler of an event loop."""
+        event_loop.set_debug(config.application.debug)
+        if config.application.debug:
+            event_loop.slow_callback_duration = SLOW_CALLBACK_DURATION
+        event_loop.set_exception_handler(self.__event_loop_exception_handler)
+        return event_loop
+
+    def create_task(self, coro: Coroutine, name: str) -> asyncio.Task:
+        """Create a task on the forwarder event loop and track it until it is done."""
+        task = self.event_loop.create_task(coro, name=name)
+        self.tasks.add(task)
+        task.add_done_callback(self.tasks.discard)
+        return task
+
     def __event_loop_exception_handler(
         self, event_loop: AbstractEventLoop | None, context: dict
     ):
@@ -229,7 +254,7 @@ class Forwarder(metaclass=SingletonMeta):
         _ = self.create_pid_file()
 
         # Create a task for the __forwarder coroutine.
-        __forwarder_task = self.event_loop.create_task(
+        __forwarder_task = self.create_task(
             self.__forwarder_task(), name="forwarder_task"
         )
 
@@ -297,7 +322,7 @@ class Forwarder(metaclass=SingletonMeta):
             pid = os.getpid()
 
             # Create the PID file.
-            forwarder_pid_file = f"{config.application.name}.pid"
+            forwarder_pid_file = PID_FILE
             process_state, _ = self.determine_process_state(forwarder_pid_file)
 
             if process_state == ProcessStateEnum.RUNNING:
@@ -310,6 +335,7 @@ class Forwarder(metaclass=SingletonMeta):
             try:
                 with open(forwarder_pid_file, "w", encoding="utf-8") as pid_file:
                     pid_file.write(str(pid))
+                self.invalidate_process_state()
             except OSError as err:
                 self.logger.error("Unable to create PID file: %s", err)
                 print(f"Unable to create PID file: {err}", flush=True)
@@ -325,7 +351,7 @@ class Forwarder(metaclass=SingletonMeta):
         """Remove a PID file."""
         self.logger.debug("Removing PID file.")
         if pid_file is None:
-            pid_file = f"{config.application.name}.pid"
+            pid_file = PID_FILE
 
         # determine if the pid file exists
         if not os.path.isfile(pid_file):
@@ -334,12 +360,30 @@ class Forwarder(metaclass=SingletonMeta):
 
         try:
             os.remove(pid_file)
+            self.invalidate_process_state()
         except FileNotFoundError:
             self.logger.error("PID file '%s' not found.", pid_file)
         except Exception as ex:  # pylint: disable=broad-except
             self.logger.exception(ex)
             self.logger.error("Failed to remove PID file '%s'.", pid_file)
 
+    def cached_process_state(
+        self, ttl: float = PROCESS_STATE_TTL
+    ) -> Tuple[ProcessStateEnum, int]:
+        """Determine the state of the process, reusing a result younger than `ttl`."""
+        now = time.monotonic()
+        cached = self._process_state_cache.get(ttl)
+        if cached is not None and now - cached[0] < ttl:
+            return cached[1], cached[2]
+
+        process_state, pid = self.determine_process_state()
+        self._process_state_cache[ttl] = (now, process_state, pid)
+        return process_state, pid
+
+    def invalidate_process_state(self):
+        """Drop the cached process states, the next lookups read the PID file."""
+        self._process_state_cache.clear()
+
     def determine_process_state(
         self, pid_file: str | None = None
     ) -> Tuple[ProcessStateEnum, int]:
@@ -363,7 +407,7 @@ class Forwarder(metaclass=SingletonMeta):
         """
 
         if pid_file is None:
-            pid_file = f"{config.application.name}.pid"
+            pid_file = PID_FILE
 
         if not os.path.isfile(pid_file):
             # The PID file does not exist, so the process is considered stopped.
@@ -398,53 +442,61 @@ class Forwarder(metaclass=SingletonMeta):
     async def init_clients(self) -> Tuple[TelegramClient, discord.Client]:
         """Handle the initialization of the bridge's clients."""
 
-        event_loop = asyncio.get_event_loop()
+        event_loop = asyncio.get_running_loop()
 
-        self.telegram_client = await TelegramHandler(self.dispatcher).init_client(
-            event_loop
+        # the Discord client logs in while the Telegram client signs in
+        telegram_client, discord_client = await asyncio.gather(
+            TelegramHandler(self.dispatcher).init_client(event_loop),
+            DiscordHandler().init_client(),
+            return_exceptions=True,
         )
-        self.discord_client = await DiscordHandler().init_client()
+        for client_name, client in (
+            ("Telegram", telegram_client),
+            ("Discord", discord_client),
+        ):
+            if isinstance(client, BaseException):
+                self.logger.error(
+                    "Error while initializing the %s client: %s",
+                    client_name,
+                    client,
+                    exc_info=config.application.debug,
+                )
+        if isinstance(telegram_client, BaseException):
+            if not isinstance(discord_client, BaseException):
+                await discord_client.close()
+            raise telegram_client
+        if isinstance(discord_client, BaseException):
+            await telegram_client.disconnect()  # type: ignore
+            raise discord_client
+
+        self.telegram_client = telegram_client
+        self.discord_client = discord_client
 
         # Set signal handlers for graceful shutdown on received signal (except on Windows)
         # NOTE: This is not supported on Windows
-        if os.name != "nt" and not config.api.enabled:
+        if os.name != "nt":
             for sig in (signal.SIGINT, signal.SIGTERM):
-                event_loop.add_signal_handler(
-                    sig,
-                    lambda sig=sig: asyncio.create_task(
-                        self.shutdown(sig), name="shutdown_task"
-                    ),
-                )  # type: ignore
-        if config.api.enabled:
-            for sig in (signal.SIGINT, signal.SIGTERM):
-                event_loop.add_signal_handler(
-                    sig,
-                    lambda: asyncio.create_task(
-                        self.api_shutdown(), name="on_shutdown_task"
-                    ),
-                )
+                event_loop.add_signal_handler(sig, self.__handle_signal, sig)
 
         try:
             lock = asyncio.Lock()
             await lock.acquire()
             bridge = Bridge(self.telegram_client, self.discord_client)
             # Create tasks for starting the main logic and waiting for clients to disconnect
-            start_task = event_loop.create_task(
-                bridge.start(), name="bridge_start_task"
-            )
-            telegram_wait_task = event_loop.create_task(
+            start_task = self.create_task(bridge.start(), name="bridge_start_task")
+            telegram_wait_task = self.create_task(
                 self.telegram_client.run_until_disconnected(), name="telegram_wait_task"  # type: ignore
             )
-            discord_wait_task = event_loop.create_task(
+            discord_wait_task = self.create_task(
                 self.discord_client.wait_until_ready(), name="discord_wait_task"
             )
-            api_healthcheck_task = event_loop.create_task(
+            api_healthcheck_task = self.create_task(
                 HealthHandler(
                     self.dispatcher, self.telegram_client, self.discord_client
                 ).check(config.application.healthcheck_interval),
                 name="api_healthcheck_task",
             )
-            on_restored_connectivity_task = event_loop.create_task(
+            on_restored_connectivity_task = self.create_task(
                 bridge.on_restored_connectivity(), name="on_restored_connectivity_task"
             )
             lock.release()
@@ -469,12 +521,23 @@ class Forwarder(metaclass=SingletonMeta):
 
         return self.telegram_client, self.discord_client
 
-    async def api_shutdown(self):
-        """Shutdown the bridge."""
-        self.logger.info("Starting shutdown process...")
-        task = asyncio.current_task()
-        all_tasks = asyncio.all_tasks(self.event_loop)
+    def __handle_signal(self, sig: signal.Signals):
+        """Start a single shutdown, whatever the number of signals received."""
+        if self.shutdown_task is not None and not self.shutdown_task.done():
+            self.logger.warning("Shutdown already in progress, ignoring %s", sig)
+            return
+
+        if config.api.enabled:
+            self.shutdown_task = asyncio.create_task(
+                self.api_shutdown(), name="on_shutdown_task"
+            )
+        else:
+            self.shutdown_task = asyncio.create_task(
+                self.shutdown(sig), name="shutdown_task"
+            )
 
+    async def __disconnect_clients(self):
+        """Disconnect the clients and flush the pending history."""
         try:
             self.logger.info("Disconnecting Telegram client...")
             await self.telegram_client.disconnect()  # type: ignore
@@ -496,35 +559,30 @@ class Forwarder(metaclass=SingletonMeta):
         ) as ex:  # pylint: disable=broad-except
             self.logger.error("Error disconnecting Discord client: %s", {ex})
 
-        # if not config.api.enabled:
-        for running_task in all_tasks:
-            if (
-                running_task is not task
-                and not running_task.done()
-                and not running_task.cancelled()
-            ):
-                if (
-                    running_task is not None
-                    and running_task.get_name() in forwarder_tasks
-                ):
-                    self.logger.debug(
-                        "Cancelling task %s...", {running_task.get_name()}
-                    )
-                    try:
-                        running_task.cancel()
-                    except Exception as ex:  # pylint: disable=broad-except
-                        self.logger.error(
-                            "Error cancelling task %s: %s", {running_task}, {ex}
-                        )
+        await MessageHistoryHandler().flush_mapping_data()
+
+    async def api_shutdown(self):
+        """Shutdown the bridge, leaving the API event loop running."""
+        self.logger.info("Starting shutdown process...")
+        task = asyncio.current_task()
+
+        await self.__disconnect_clients()
+
+        for running_task in list(self.tasks):
+            if running_task is not task and not running_task.done():
+                self.logger.debug("Cancelling task %s...", {running_task.get_name()})
+                running_task.cancel()
 
         self.remove_pid_file()
         self.logger.info("Shutdown process completed.")
 
     async def shutdown(self, sig):
-        """Shutdown the application gracefully."""
+        """Shutdown the application gracefully and stop the event loop."""
         self.logger.warning("Shutdown received signal %s, shutting down...", {sig})
 
-        # Cancel all tasks
+        await self.__disconnect_clients()
+
+        # Cancel all tasks, the loop is stopped right after
         tasks = [
             task for task in asyncio.all_tasks() if task is not asyncio.current_task()
         ]
@@ -533,9 +591,7 @@ class Forwarder(metaclass=SingletonMeta):
             task.cancel()
 
         # Wait for all tasks to be cancelled
-        results = await asyncio.gather(
-            *tasks, return_exceptions=config.application.debug
-        )
+        results = await asyncio.gather(*tasks, return_exceptions=True)
 
         # Check for errors
         for result in results:
@@ -544,7 +600,6 @@ class Forwarder(metaclass=SingletonMeta):
             if isinstance(result, Exception):
                 self.logger.error("Error during shutdown: %s", result)
 
-        # if not config.api.enabled:
         # Stop the loop
         if self.event_loop is not None:
             self.event_loop.stop()
@@ -622,6 +677,11 @@ if __name__ == "__main__":
 
     shoud_start: bool = __start or __stop
 
-    forwarder = Forwarder(asyncio.new_event_loop(), __background)
+    # uvicorn already picks uvloop in API mode, do the same for the CLI
+    event_loop = (
+        uvloop.new_event_loop() if uvloop is not None else asyncio.new_event_loop()
+    )
+
+    forwarder = Forwarder(event_loop, __background)
 
     forwarder.cli_controller(start_forwarding=shoud_start)
@@ -24,7 +24,7 @@ __command_exists() {
 #######################################
 run() {
   if __command_exists uvicorn; then
-    uvicorn api.api:app --reload
+    uvicorn api.api:app --reload --ws-per-message-deflate false
   else
     echo "uvicorn is not installed. Please install it using 'pip install uvicorn, or check that you're in the correct virtual environment'"
   fi